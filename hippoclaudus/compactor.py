@@ -5,12 +5,14 @@ which are duplicates or superseded, and merges them into consolidated entries.
 """
 
 import json
+import math
+from collections import Counter, defaultdict
 from datetime import datetime, timezone
 
 import click
 
 from hippoclaudus.db_bridge import MemoryDB, Memory
-from hippoclaudus.llm import run_prompt, extract_json
+from hippoclaudus.llm import iter_run_prompt, extract_json
 
 
 MERGE_PROMPT = """You are a memory deduplication system. Given these two memories, determine if they should be merged.
@@ -38,15 +40,63 @@ Rules:
 Return ONLY the JSON object."""
 
 
-def _similarity_simple(a: str, b: str) -> float:
-    """Quick token-overlap similarity (no embeddings needed)."""
-    tokens_a = set(a.lower().split())
-    tokens_b = set(b.lower().split())
+def _tokenize(text: str) -> frozenset:
+    """Lowercased whitespace token set used for similarity comparisons."""
+    # str.lower/str.split are already C-level and Unicode-aware; an ASCII
+    # bytes.translate path measured no faster and would miss non-ASCII case.
+    return frozenset(text.lower().split())
+
+
+def _jaccard(tokens_a: frozenset, tokens_b: frozenset) -> float:
+    """Jaccard similarity of two pre-tokenized sets."""
     if not tokens_a or not tokens_b:
         return 0.0
-    intersection = tokens_a & tokens_b
-    union = tokens_a | tokens_b
-    return len(intersection) / len(union)  # Jaccard similarity
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+def _similarity_simple(a: str, b: str) -> float:
+    """Quick token-overlap similarity (no embeddings needed)."""
+    return _jaccard(_tokenize(a), _tokenize(b))
+
+
+def _candidate_pairs(tokens: list, threshold: float) -> list:
+    """Return (i, j, sim) for every pair with Jaccard >= threshold, in (i, j) order.
+
+    Prefix filtering over an inverted index: with tokens ordered rarest
+    first, two sets reaching the threshold must share a token within
+    their first |x| - ceil(threshold * |x|) + 1 tokens. Only pairs that
+    collide on a prefix token (and pass the size bound) get an exact
+    Jaccard check, so the result matches a full pairwise scan.
+    """
+    n = len(tokens)
+    if threshold <= 0:
+        # Every pair qualifies (even empty sets score 0.0 >= threshold)
+        return [(i, j, _jaccard(tokens[i], tokens[j])) for i in range(n) for j in range(i + 1, n)]
+
+    doc_freq = Counter(t for toks in tokens for t in toks)
+    index = defaultdict(list)
+    seen = set()
+    for i, toks in enumerate(tokens):
+        if not toks:
+            continue
+        ordered = sorted(toks, key=lambda t: (doc_freq[t], t))
+        # Small epsilon so float error (0.28 * 25 = 7.000000000000001) can't shorten the prefix
+        min_overlap = max(1, math.ceil(threshold * len(ordered) - 1e-9))
+        for t in ordered[:len(ordered) - min_overlap + 1]:
+            for j in index[t]:
+                seen.add((j, i))
+            index[t].append(i)
+
+    pairs = []
+    for i, j in sorted(seen):
+        a, b = tokens[i], tokens[j]
+        # Size bound: J(a, b) <= min/max, so skip before doing set ops
+        if min(len(a), len(b)) < threshold * max(len(a), len(b)) - 1e-9:
+            continue
+        sim = _jaccard(a, b)
+        if sim >= threshold:
+            pairs.append((i, j, sim))
+    return pairs
 
 
 def run_compact(model_name: str, db_path: str, dry_run: bool = False, threshold: float = 0.3):
@@ -63,13 +113,13 @@ def run_compact(model_name: str, db_path: str, dry_run: bool = False, threshold:
 
     click.echo(f"Comparing {len(memories)} memories (threshold: {threshold})...\n")
 
-    # Find candidate pairs with token overlap above threshold
-    candidates = []
-    for i in range(len(memories)):
-        for j in range(i + 1, len(memories)):
-            sim = _similarity_simple(memories[i]["content"], memories[j]["content"])
-            if sim >= threshold:
-                candidates.append((memories[i], memories[j], sim))
+    # Find candidate pairs with token overlap above threshold.
+    # Tokenize each memory once, then only score pairs that share a prefix token.
+    tokens = [_tokenize(m["content"]) for m in memories]
+    candidates = [
+        (memories[i], memories[j], sim)
+        for i, j, sim in _candidate_pairs(tokens, threshold)
+    ]
 
     if not candidates:
         click.echo("No candidate pairs found above similarity threshold.")
@@ -78,20 +128,25 @@ def run_compact(model_name: str, db_path: str, dry_run: bool = False, threshold:
 
     click.echo(f"Found {len(candidates)} candidate pair(s).\n")
 
-    merged_count = 0
-    for mem_a, mem_b, sim in candidates:
-        click.echo(f"--- Pair (similarity: {sim:.2f}) ---")
-        click.echo(f"  A [{mem_a['id']}]: {mem_a['content'][:80]}...")
-        click.echo(f"  B [{mem_b['id']}]: {mem_b['content'][:80]}...")
-
-        # Ask LLM to evaluate
-        prompt = MERGE_PROMPT.format(
+    # Ask the LLM to evaluate every pair in one request; verdicts stream back in
+    # pair order, so soft-deletes for one pair overlap inference for the next
+    prompts = [
+        MERGE_PROMPT.format(
             date_a=mem_a.get("created_at_iso", "unknown"),
             content_a=mem_a["content"],
             date_b=mem_b.get("created_at_iso", "unknown"),
             content_b=mem_b["content"],
         )
-        response = run_prompt(model_name, prompt, max_tokens=512, temp=0.1)
+        for mem_a, mem_b, _ in candidates
+    ]
+    responses = iter_run_prompt(model_name, prompts, max_tokens=512, temp=0.1)
+
+    merged_count = 0
+    for (mem_a, mem_b, sim), response in zip(candidates, responses):
+        click.echo(f"--- Pair (similarity: {sim:.2f}) ---")
+        click.echo(f"  A [{mem_a['id']}]: {mem_a['content'][:80]}...")
+        click.echo(f"  B [{mem_b['id']}]: {mem_b['content'][:80]}...")
+
         result = extract_json(response)
 
         if not result:
@@ -126,9 +181,11 @@ def run_compact(model_name: str, db_path: str, dry_run: bool = False, threshold:
                         memory_type="note",
                         metadata={"source": "hippo-compact", "merged_from": [mem_a["content_hash"][:16], mem_b["content_hash"][:16]]},
                     )
-                    row_id = db.store_memory(new_mem)
-                    _soft_delete(db, mem_a["content_hash"])
-                    _soft_delete(db, mem_b["content_hash"])
+                    # Insert + both soft-deletes land atomically in one commit
+                    with db.transaction():
+                        row_id = db.store_memory(new_mem)
+                        _soft_delete(db, mem_a["content_hash"])
+                        _soft_delete(db, mem_b["content_hash"])
                     click.echo(f"  -> Merged into new memory #{row_id}, soft-deleted originals")
                     merged_count += 1
         elif dry_run and relationship in ("duplicate", "superseded"):
@@ -148,18 +205,11 @@ def _soft_delete(db: MemoryDB, content_hash: str):
         "UPDATE memories SET deleted_at = ? WHERE content_hash = ?",
         (now, content_hash),
     )
-    db.conn.commit()
+    db.commit()
 
 
 def _merge_tags(tags_a: str, tags_b: str) -> str:
     """Merge two comma-separated tag strings, deduplicating."""
-    all_tags = set()
-    for t in (tags_a or "").split(","):
-        t = t.strip()
-        if t:
-            all_tags.add(t)
-    for t in (tags_b or "").split(","):
-        t = t.strip()
-        if t:
-            all_tags.add(t)
-    return ",".join(sorted(all_tags))
+    merged = {t.strip() for tags in (tags_a, tags_b) if tags for t in tags.split(",")}
+    merged.discard("")
+    return ",".join(sorted(merged))
@@ -2,6 +2,12 @@
 
 Designed to coexist safely with the running MCP memory server.
 Uses WAL mode and short transactions to avoid lock contention.
+
+Lock model: the connection runs in autocommit mode, so each write outside
+MemoryDB.transaction() is its own one-statement transaction. transaction()
+opens BEGIN IMMEDIATE, taking the WAL write lock up front: a contending
+writer waits on busy_timeout at BEGIN instead of failing mid-batch when a
+read lock can't be upgraded. Readers never block under WAL.
 """
 
 import hashlib
@@ -9,9 +15,10 @@ import json
 import os
 import sqlite3
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 
 @dataclass
@@ -44,16 +51,34 @@ class Memory:
             self.updated_at_iso = datetime.fromtimestamp(self.updated_at, tz=timezone.utc).isoformat()
 
 
+def _count_tags(tags: Optional[str]) -> int:
+    """Number of non-blank comma-separated tags (same rule the tagger uses)."""
+    if not tags:
+        return 0
+    return sum(1 for t in tags.split(",") if t.strip())
+
+
 class MemoryDB:
     """Direct SQLite access to memory.db, safe for concurrent use with MCP server."""
 
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, timeout=10)
+        # "file:..." paths are SQLite URIs (e.g. a shared-cache in-memory DB)
+        self.conn = sqlite3.connect(
+            db_path, timeout=10, uri=os.fspath(db_path).startswith("file:"),
+            isolation_level=None,  # autocommit; transaction() issues BEGIN IMMEDIATE
+        )
         self.conn.row_factory = sqlite3.Row
         # WAL mode for concurrent reads
         self.conn.execute("PRAGMA journal_mode=WAL")
         self.conn.execute("PRAGMA busy_timeout=5000")
+        # Per-connection tuning: under WAL, NORMAL only fsyncs at checkpoints
+        # (still corruption-safe); temp tables in RAM; memory-mapped reads
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.create_function("tag_count", 1, _count_tags, deterministic=True)
+        self._in_transaction = False
 
     def close(self):
         self.conn.close()
@@ -64,6 +89,35 @@ class MemoryDB:
     def __exit__(self, *args):
         self.close()
 
+    # --- Transactions ---
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes into a single commit; roll back on error.
+
+        Write methods skip their own commit while inside the block. Nested
+        calls join the outermost transaction.
+        """
+        if self._in_transaction:
+            yield
+            return
+        self._in_transaction = True
+        try:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+            yield
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+
+    def commit(self):
+        """Commit any open transaction, unless inside transaction() (which commits on exit)."""
+        if not self._in_transaction:
+            self.conn.commit()
+
     # --- Read Operations ---
 
     def get_all_memories(self, limit: int = 100, offset: int = 0) -> list[dict]:
@@ -83,6 +137,15 @@ class MemoryDB:
         row = cursor.fetchone()
         return dict(row) if row else None
 
+    def get_memories_by_type(self, memory_type: str, limit: int = 50) -> list[dict]:
+        """Fetch memories of one type, most recent first (served by idx_memory_type)."""
+        cursor = self.conn.execute(
+            "SELECT * FROM memories WHERE memory_type = ? AND deleted_at IS NULL "
+            "ORDER BY created_at DESC LIMIT ?",
+            (memory_type, limit),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
     def search_by_tag(self, tag: str) -> list[dict]:
         """Find memories containing a specific tag."""
         cursor = self.conn.execute(
@@ -91,6 +154,21 @@ class MemoryDB:
         )
         return [dict(row) for row in cursor.fetchall()]
 
+    def get_undertagged_memories(self, min_tags: int = 5, limit: int = 1000) -> list[dict]:
+        """Fetch memories with fewer than min_tags tags, most recent first.
+
+        Tags are counted inside the query by the tag_count() SQL function, which
+        skips blank segments ("a,,b" or a trailing comma) like the tagger does,
+        so well-tagged rows never leave the DB.
+        """
+        cursor = self.conn.execute(
+            """SELECT * FROM memories
+               WHERE deleted_at IS NULL AND tag_count(tags) < ?
+               ORDER BY created_at DESC LIMIT ?""",
+            (min_tags, limit),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
     def get_memory_count(self) -> int:
         cursor = self.conn.execute("SELECT COUNT(*) FROM memories WHERE deleted_at IS NULL")
         return cursor.fetchone()[0]
@@ -110,28 +188,44 @@ class MemoryDB:
 
     # --- Write Operations ---
 
-    def store_memory(self, memory: Memory) -> int:
-        """Insert a new memory. Returns the row ID."""
-        metadata_json = json.dumps(memory.metadata) if memory.metadata else "{}"
-        cursor = self.conn.execute(
-            """INSERT INTO memories (content_hash, content, tags, memory_type, metadata,
+    _INSERT_MEMORY_SQL = """INSERT INTO memories (content_hash, content, tags, memory_type, metadata,
                created_at, updated_at, created_at_iso, updated_at_iso)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                memory.content_hash,
-                memory.content,
-                memory.tags,
-                memory.memory_type,
-                metadata_json,
-                memory.created_at,
-                memory.updated_at,
-                memory.created_at_iso,
-                memory.updated_at_iso,
-            ),
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+    @staticmethod
+    def _memory_row(memory: Memory) -> tuple:
+        """Parameters for _INSERT_MEMORY_SQL."""
+        metadata_json = json.dumps(memory.metadata) if memory.metadata else "{}"
+        return (
+            memory.content_hash,
+            memory.content,
+            memory.tags,
+            memory.memory_type,
+            metadata_json,
+            memory.created_at,
+            memory.updated_at,
+            memory.created_at_iso,
+            memory.updated_at_iso,
         )
-        self.conn.commit()
+
+    def store_memory(self, memory: Memory) -> int:
+        """Insert a new memory. Returns the row ID."""
+        cursor = self.conn.execute(self._INSERT_MEMORY_SQL, self._memory_row(memory))
+        self.commit()
         return cursor.lastrowid
 
+    def store_memories(self, memories: Iterable[Memory]) -> int:
+        """Insert many memories with one executemany in a single transaction.
+
+        All-or-nothing: a duplicate hash rolls back the whole batch. Returns the
+        number of rows inserted.
+        """
+        with self.transaction():
+            cursor = self.conn.executemany(
+                self._INSERT_MEMORY_SQL, (self._memory_row(m) for m in memories)
+            )
+        return cursor.rowcount
+
     def update_tags(self, content_hash: str, tags: str):
         """Update tags on an existing memory."""
         now = time.time()
@@ -141,7 +235,7 @@ class MemoryDB:
             "UPDATE memories SET tags = ?, updated_at = ?, updated_at_iso = ? WHERE content_hash = ?",
             (tags, now, now_iso, content_hash),
         )
-        self.conn.commit()
+        self.commit()
 
     def store_graph_edge(self, source_hash: str, target_hash: str, similarity: float,
                          connection_types: str = "consolidation", relationship_type: str = "related"):
@@ -153,7 +247,7 @@ class MemoryDB:
                VALUES (?, ?, ?, ?, ?, ?, ?)""",
             (source_hash, target_hash, similarity, connection_types, "{}", now, relationship_type),
         )
-        self.conn.commit()
+        self.commit()
 
     # --- Session Log Parsing ---
 
@@ -165,11 +259,11 @@ class MemoryDB:
             return None
 
         text = path.read_text()
-        # Split on session headers (## YYYY-MM-DD)
-        sections = text.split("\n## ")
-        if len(sections) < 2:
+        # Last session header (## YYYY-MM-DD) starts the most recent session;
+        # one backwards scan instead of splitting every section out
+        idx = text.rfind("\n## ")
+        if idx == -1:
             return None
 
-        # Last section is the most recent session
-        latest = "## " + sections[-1]
+        latest = text[idx + 1:]
         return latest.strip()
@@ -13,8 +13,8 @@ import json
 import shutil
 import subprocess
 import sys
+import time
 import venv
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
@@ -107,22 +107,23 @@ def verify_mcp_install(venv_path: Path) -> bool:
 # ---------------------------------------------------------------------------
 
 def backup_config(config_path: Path) -> Path:
-    """Back up the config file with a timestamped suffix. Returns backup path."""
-    timestamp = datetime.now().strftime("%Y-%m-%dT%H%M")
-    bak_path = config_path.parent / f"{config_path.name}.bak.{timestamp}"
-    # If this exact timestamp exists (ran twice in same minute), add seconds
-    if bak_path.exists():
-        timestamp = datetime.now().strftime("%Y-%m-%dT%H%M%S")
-        bak_path = config_path.parent / f"{config_path.name}.bak.{timestamp}"
+    """Back up the config file with a nanosecond-timestamp suffix. Returns backup path."""
+    stamp = time.time_ns()
+    bak_path = config_path.parent / f"{config_path.name}.bak.{stamp}"
+    # Coarse clocks (e.g. Windows) can repeat a reading; bump past any existing file
+    while bak_path.exists():
+        stamp += 1
+        bak_path = config_path.parent / f"{config_path.name}.bak.{stamp}"
     shutil.copy2(config_path, bak_path)
     return bak_path
 
 
-def merge_mcp_config(config_path: Path, venv_python: str, db_path: str) -> None:
+def merge_mcp_config(config_path: Path, venv_python: str, db_path: str) -> dict:
     """Merge the Hippoclaudus MCP server entry into the Claude config.
 
     Preserves all existing mcpServers entries. Creates the file if missing.
     Raises InstallerError if existing file contains malformed JSON.
+    Returns the merged config as written, so callers need not re-read it.
     """
     if config_path.exists():
         raw = config_path.read_text()
@@ -148,17 +149,27 @@ def merge_mcp_config(config_path: Path, venv_python: str, db_path: str) -> None:
         },
     }
 
-    # Validate round-trip before writing
-    output = json.dumps(data, indent=2)
-    json.loads(output)  # Will raise if somehow broken
-
-    config_path.write_text(output + "\n")
+    # data came from json.loads plus str-only additions, so json.dumps output
+    # is valid JSON by construction -- no need to re-parse it before writing
+    config_path.write_text(json.dumps(data, indent=2) + "\n")
+    return data
 
 
 # ---------------------------------------------------------------------------
 # Template copying
 # ---------------------------------------------------------------------------
 
+# Memory templates and the install path they land in. Never overwritten, so a
+# reinstall keeps the user's logs.
+MEMORY_TEMPLATES = (
+    ("INDEX.md", "long_term"),
+    ("Infrastructure_Notes.md", "long_term"),
+    ("Session_Summary_Log.md", "working"),
+    ("Open_Questions_Blockers.md", "working"),
+    ("Decision_Log.md", "working"),
+)
+
+
 def copy_templates(paths: dict) -> list:
     """Copy template files to the install base and substitute paths.
 
@@ -167,23 +178,22 @@ def copy_templates(paths: dict) -> list:
     copied = []
     base_str = str(paths["base"])
 
-    # Long-term memory templates
-    for name in ("INDEX.md", "Infrastructure_Notes.md"):
-        src = TEMPLATE_DIR / name
-        if src.exists():
-            dst = paths["long_term"] / name
-            if not dst.exists():
-                shutil.copy2(src, dst)
-                copied.append(str(dst))
-
-    # Working memory templates
-    for name in ("Session_Summary_Log.md", "Open_Questions_Blockers.md", "Decision_Log.md"):
-        src = TEMPLATE_DIR / name
-        if src.exists():
-            dst = paths["working"] / name
-            if not dst.exists():
-                shutil.copy2(src, dst)
-                copied.append(str(dst))
+    # Memory templates -- exclusive create ("xb") does the exists check and the
+    # open in one call, and can't clobber a file created since the check
+    for name, dest in MEMORY_TEMPLATES:
+        dst = paths[dest] / name
+        try:
+            fsrc = open(TEMPLATE_DIR / name, "rb")
+        except FileNotFoundError:
+            continue
+        with fsrc:
+            try:
+                fdst = open(dst, "xb")
+            except FileExistsError:
+                continue
+            with fdst:
+                shutil.copyfileobj(fsrc, fdst)
+        copied.append(str(dst))
 
     # CLAUDE.md -- always overwrite with fresh template (personalize later)
     src = TEMPLATE_DIR / "CLAUDE.md"
@@ -201,11 +211,23 @@ def copy_templates(paths: dict) -> list:
 # Uninstall helpers
 # ---------------------------------------------------------------------------
 
+def _backup_sort_key(bak_path: Path) -> tuple:
+    """Order backups oldest first.
+
+    Current backups carry a time_ns() suffix and compare numerically; older
+    releases used a "%Y-%m-%dT%H%M" suffix, which sorts before any of them.
+    """
+    suffix = bak_path.name.rsplit(".bak.", 1)[-1]
+    if suffix.isdigit():
+        return (1, int(suffix), "")
+    return (0, 0, suffix)
+
+
 def find_latest_backup(config_path: Path) -> Optional[Path]:
     """Find the most recent .bak file for the config."""
     pattern = f"{config_path.name}.bak.*"
-    backups = sorted(config_path.parent.glob(pattern))
-    return backups[-1] if backups else None
+    backups = config_path.parent.glob(pattern)
+    return max(backups, key=_backup_sort_key, default=None)
 
 
 def remove_memory_from_config(config_path: Path) -> None:
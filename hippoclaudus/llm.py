@@ -15,8 +15,11 @@ Model format differs by backend:
 import json
 import os
 import platform
+import queue
 import re
-from typing import Optional
+import threading
+from functools import lru_cache
+from typing import Iterator, Optional
 
 
 # ============================================================
@@ -24,7 +27,11 @@ from typing import Optional
 # ============================================================
 
 _backend: Optional[str] = None
-_backend_cache: dict = {}
+
+# Loaded models live in a small LRU so a long-running process doesn't keep
+# every model it has touched resident (default + fallback fit without churn).
+# An evicted model is freed once no caller still holds a reference to it.
+MODEL_CACHE_SIZE = 2
 
 
 def detect_backend() -> str:
@@ -75,10 +82,8 @@ def get_backend() -> str:
 def _load_mlx(model_name: str):
     """Load an MLX model. Returns (model, tokenizer)."""
     from mlx_lm import load
-    if model_name not in _backend_cache:
-        model, tokenizer = load(model_name)
-        _backend_cache[model_name] = (model, tokenizer)
-    return _backend_cache[model_name]
+    model, tokenizer = load(model_name)
+    return model, tokenizer
 
 
 def _run_mlx(model_name: str, prompt: str, max_tokens: int, temp: float) -> str:
@@ -86,7 +91,7 @@ def _run_mlx(model_name: str, prompt: str, max_tokens: int, temp: float) -> str:
     from mlx_lm import generate
     from mlx_lm.sample_utils import make_sampler
 
-    model, tokenizer = _load_mlx(model_name)
+    model, tokenizer = _load_model("mlx", model_name)
 
     messages = [{"role": "user", "content": prompt}]
     if hasattr(tokenizer, "apply_chat_template"):
@@ -107,6 +112,36 @@ def _run_mlx(model_name: str, prompt: str, max_tokens: int, temp: float) -> str:
     return response
 
 
+def _run_mlx_batch(model_name: str, prompts: list[str], max_tokens: int, temp: float) -> list[str]:
+    """Run several prompts via MLX in one batched generation."""
+    try:
+        from mlx_lm import batch_generate
+    except ImportError:
+        # Older mlx-lm without batching: same cached model, one prompt at a time
+        return [_run_mlx(model_name, p, max_tokens, temp) for p in prompts]
+    from mlx_lm.sample_utils import make_sampler
+
+    model, tokenizer = _load_model("mlx", model_name)
+
+    encoded = []
+    for prompt in prompts:
+        if hasattr(tokenizer, "apply_chat_template"):
+            encoded.append(tokenizer.apply_chat_template(
+                [{"role": "user", "content": prompt}], add_generation_prompt=True
+            ))
+        else:
+            encoded.append(tokenizer.encode(prompt))
+
+    response = batch_generate(
+        model, tokenizer,
+        prompts=encoded,
+        max_tokens=max_tokens,
+        sampler=make_sampler(temp=temp),
+        verbose=False,
+    )
+    return list(response.texts)
+
+
 # ============================================================
 # llama.cpp Backend
 # ============================================================
@@ -115,25 +150,22 @@ def _load_llama_cpp(model_name: str):
     """Load a GGUF model via llama-cpp-python. Returns a Llama instance."""
     from llama_cpp import Llama
 
-    if model_name not in _backend_cache:
-        if not os.path.isfile(model_name):
-            raise FileNotFoundError(
-                f"GGUF model not found: {model_name}\n"
-                f"Download a GGUF model and pass the file path as model_name."
-            )
-        llm = Llama(
-            model_path=model_name,
-            n_ctx=4096,
-            n_gpu_layers=-1,  # offload all layers to GPU
-            verbose=False,
+    if not os.path.isfile(model_name):
+        raise FileNotFoundError(
+            f"GGUF model not found: {model_name}\n"
+            f"Download a GGUF model and pass the file path as model_name."
         )
-        _backend_cache[model_name] = llm
-    return _backend_cache[model_name]
+    return Llama(
+        model_path=model_name,
+        n_ctx=4096,
+        n_gpu_layers=-1,  # offload all layers to GPU
+        verbose=False,
+    )
 
 
 def _run_llama_cpp(model_name: str, prompt: str, max_tokens: int, temp: float) -> str:
     """Run inference via llama-cpp-python."""
-    llm = _load_llama_cpp(model_name)
+    llm = _load_model("llama_cpp", model_name)
 
     response = llm.create_chat_completion(
         messages=[{"role": "user", "content": prompt}],
@@ -147,6 +179,35 @@ def _run_llama_cpp(model_name: str, prompt: str, max_tokens: int, temp: float) -
 # Unified Interface
 # ============================================================
 
+# Uncached loader per backend. Swap an entry to inject a fake loader (tests).
+MODEL_LOADERS = {
+    "mlx": _load_mlx,
+    "llama_cpp": _load_llama_cpp,
+}
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _load_model(backend: str, model_name: str):
+    """Load through MODEL_LOADERS, keeping the most recently used models resident."""
+    return MODEL_LOADERS[backend](model_name)
+
+
+def get_model(model_name: str):
+    """Return the cached model for the active backend, loading it on first use.
+
+    MLX returns (model, tokenizer); llama.cpp returns a Llama instance.
+    """
+    backend = detect_backend()
+    if backend not in MODEL_LOADERS:
+        raise RuntimeError(f"Unknown backend: {backend}")
+    return _load_model(backend, model_name)
+
+
+def clear_model_cache() -> None:
+    """Drop all cached models so they can be reclaimed."""
+    _load_model.cache_clear()
+
+
 def run_prompt(model_name: str, prompt: str, max_tokens: int = 1024, temp: float = 0.3) -> str:
     """Run a prompt through the local LLM. Backend is auto-detected."""
     backend = detect_backend()
@@ -158,22 +219,106 @@ def run_prompt(model_name: str, prompt: str, max_tokens: int = 1024, temp: float
         raise RuntimeError(f"Unknown backend: {backend}")
 
 
-def extract_json(text: str) -> Optional[dict]:
-    """Extract JSON object from LLM output, handling markdown code fences."""
-    fence_match = re.search(r"```(?:json)?\s*\n?(.*?)\n?```", text, re.DOTALL)
-    if fence_match:
-        text = fence_match.group(1)
+def _in_background(items: Iterator) -> Iterator:
+    """Drain an iterator on a worker thread, yielding its items in order as they arrive.
+
+    The caller's per-item work overlaps production of the next item.
+    Exceptions raised by the producer are re-raised in the caller.
+    """
+    done = object()
+    results = queue.Queue()
+    stop = threading.Event()
 
-    brace_match = re.search(r"\{.*\}", text, re.DOTALL)
-    if brace_match:
+    def worker():
         try:
-            return json.loads(brace_match.group(0))
-        except json.JSONDecodeError:
-            pass
+            for item in items:
+                results.put((item, None))
+                if stop.is_set():
+                    return
+        except Exception as e:
+            results.put((None, e))
+        finally:
+            results.put(done)
+
+    threading.Thread(target=worker, daemon=True).start()
+    try:
+        while True:
+            entry = results.get()
+            if entry is done:
+                return
+            item, error = entry
+            if error is not None:
+                raise error
+            yield item
+    finally:
+        stop.set()
+
+
+def iter_run_prompt(model_name: str, prompts: list[str], max_tokens: int = 1024,
+                    temp: float = 0.3) -> Iterator[str]:
+    """Yield responses in prompt order, overlapping the caller's work with inference.
+
+    llama-cpp-python has no batched chat API, so prompts run back-to-back
+    on a background thread while the caller handles earlier results. MLX
+    generates the whole batch in one pass on the calling thread.
+    """
+    if not prompts:
+        return
+    backend = detect_backend()
+    if backend == "mlx":
+        yield from _run_mlx_batch(model_name, prompts, max_tokens, temp)
+    elif backend == "llama_cpp":
+        yield from _in_background(
+            _run_llama_cpp(model_name, p, max_tokens, temp) for p in prompts
+        )
+    else:
+        raise RuntimeError(f"Unknown backend: {backend}")
+
+
+def batch_run_prompt(model_name: str, prompts: list[str], max_tokens: int = 1024,
+                     temp: float = 0.3) -> list[str]:
+    """Run several prompts through the local LLM, returning responses in prompt order."""
+    return list(iter_run_prompt(model_name, prompts, max_tokens, temp))
+
+
+# Compiled once at import; extract_json runs on every LLM response
+_FENCE_RE = re.compile(r"```(?:json)?\s*\n?(.*?)\n?```", re.DOTALL)
+_DECODER = json.JSONDecoder()
+
 
+def _decode_first_object(text: str) -> Optional[dict]:
+    """Decode the first well-formed {...} in text, or None.
+
+    Tries raw_decode at each '{' in turn. The C scanner stops as soon as the
+    object closes, so trailing prose or a second object is never read.
+    """
+    pos = 0
+    while (start := text.find("{", pos)) != -1:
+        try:
+            return _DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            pos = start + 1
+        except RecursionError:
+            # Nesting too deep for the decoder; later starts are inside the same nest
+            return None
     return None
 
 
+def extract_json(text: str, keys: Optional[set[str]] = None) -> Optional[dict]:
+    """Extract the first JSON object from LLM output, handling markdown code fences.
+
+    If keys is given, only those top-level keys are returned.
+    """
+    fence_match = _FENCE_RE.search(text)
+    if fence_match:
+        text = fence_match.group(1)
+
+    result = _decode_first_object(text)
+    if result is not None and keys is not None:
+        result = {k: v for k, v in result.items() if k in keys}
+    return result
+
+
 # ============================================================
 # Prompt Templates
 # ============================================================
@@ -238,11 +383,15 @@ Return ONLY the JSON object, no other text."""
 # High-Level Task Functions
 # ============================================================
 
+# Fields requested by CONSOLIDATION_PROMPT; anything else the model adds is dropped
+CONSOLIDATION_KEYS = {"state_delta", "entities", "security_context", "emotional_signals", "open_threads"}
+
+
 def consolidate_session(model_name: str, session_text: str) -> Optional[dict]:
     """Run the consolidation prompt and return structured output."""
     prompt = CONSOLIDATION_PROMPT.format(session_text=session_text)
     response = run_prompt(model_name, prompt, max_tokens=512)
-    return extract_json(response)
+    return extract_json(response, keys=CONSOLIDATION_KEYS)
 
 
 def tag_memory(model_name: str, content: str) -> Optional[dict]:
@@ -252,6 +401,13 @@ def tag_memory(model_name: str, content: str) -> Optional[dict]:
     return extract_json(response)
 
 
+def iter_tag_memory(model_name: str, contents: list[str]) -> Iterator[Optional[dict]]:
+    """Run the entity tagging prompt over several memories, yielding structured tags in order."""
+    prompts = [ENTITY_TAG_PROMPT.format(content=c) for c in contents]
+    for response in iter_run_prompt(model_name, prompts, max_tokens=256):
+        yield extract_json(response)
+
+
 def analyze_comm_profile(model_name: str, person: str, excerpts: str) -> Optional[dict]:
     """Run the communication profile prompt and return analysis."""
     prompt = COMM_PROFILE_PROMPT.format(person=person, excerpts=excerpts)
@@ -49,6 +49,31 @@ Generated: {timestamp}
 Return the document as plain text (NOT JSON). Use markdown formatting."""
 
 
+# Cap on session log text fed to the prompt, to avoid context overflow
+SESSION_TEXT_CAP = 3000
+
+SESSION_HEADER = "\n## "
+
+
+def _recent_sessions(text: str, count: int = 2, cap: int = SESSION_TEXT_CAP) -> str:
+    """Return the last `count` sessions (header prefix stripped), truncated to `cap` chars.
+
+    Scans back from the end with rfind instead of splitting the whole log,
+    and takes a single capped slice of the original text.
+    """
+    start = -1
+    end = len(text)
+    for _ in range(count):
+        pos = text.rfind(SESSION_HEADER, 0, end)
+        if pos == -1:
+            break
+        start = end = pos
+    if start == -1:
+        return ""
+    start += len(SESSION_HEADER)
+    return text[start:start + cap]
+
+
 def run_predict(model_name: str, db_path: str, session_log: Path, open_questions: Path, output: Path):
     """Generate PRELOAD.md for next session."""
     click.echo("=== Hippoclaudus Predict ===")
@@ -57,10 +82,7 @@ def run_predict(model_name: str, db_path: str, session_log: Path, open_questions
     session_text = ""
     if session_log.exists():
         text = session_log.read_text()
-        # Get last 2 sessions for context
-        sections = text.split("\n## ")
-        recent = sections[-2:] if len(sections) > 2 else sections[1:]
-        session_text = "\n## ".join(recent)
+        session_text = _recent_sessions(text, count=2, cap=SESSION_TEXT_CAP)
     else:
         session_text = "(no session log found)"
 
@@ -73,10 +95,9 @@ def run_predict(model_name: str, db_path: str, session_log: Path, open_questions
 
     # 3. Read recent state deltas from DB
     db = MemoryDB(db_path)
-    memories = db.get_all_memories(limit=100)
-    state_deltas = [m for m in memories if m.get("memory_type") == "state_delta"]
+    state_deltas = db.get_memories_by_type("state_delta", limit=5)  # Last 5 state deltas
     delta_text = ""
-    for sd in state_deltas[:5]:  # Last 5 state deltas
+    for sd in state_deltas:
         delta_text += f"- {sd['content'][:200]}\n"
     if not delta_text:
         delta_text = "(no state deltas yet)"
@@ -87,7 +108,7 @@ def run_predict(model_name: str, db_path: str, session_log: Path, open_questions
     click.echo(f"Generating briefing from {len(state_deltas)} state deltas...")
 
     prompt = PREDICT_PROMPT.format(
-        session_text=session_text[:3000],  # Cap to avoid context overflow
+        session_text=session_text,  # Already capped at SESSION_TEXT_CAP
         open_questions=oq_text[:2000],
         state_deltas=delta_text,
         timestamp=now,
@@ -9,7 +9,11 @@ import json
 import click
 
 from hippoclaudus.db_bridge import MemoryDB
-from hippoclaudus.llm import tag_memory
+from hippoclaudus.llm import tag_memory, iter_tag_memory
+
+# run_tag_all commits this many tag updates per transaction, so an interrupted
+# run keeps what it finished while the write lock is only held briefly
+TAG_COMMIT_BATCH = 25
 
 
 def run_tag_single(model_name: str, db_path: str, memory_id: int):
@@ -70,44 +74,63 @@ def run_tag_all(model_name: str, db_path: str):
     click.echo("=== Tagging All Memories ===")
 
     db = MemoryDB(db_path)
-    memories = db.get_all_memories(limit=1000)
+    # Already well-tagged (5+ tags) memories are filtered out in SQL
+    memories = db.get_undertagged_memories(min_tags=5, limit=1000)
 
     if not memories:
-        click.echo("No memories found.")
+        click.echo("No memories need tagging.")
         db.close()
         return
 
-    click.echo(f"Found {len(memories)} memories. Processing...\n")
-
-    tagged_count = 0
-    for m in memories:
-        existing_tags = [t.strip() for t in (m["tags"] or "").split(",") if t.strip()]
-
-        # Skip if already well-tagged (5+ tags)
-        if len(existing_tags) >= 5:
-            click.echo(f"  [{m['id']}] Already tagged ({len(existing_tags)} tags) — skipping")
-            continue
-
-        click.echo(f"  [{m['id']}] Tagging: {m['content'][:80]}...")
-
-        result = tag_memory(model_name, m["content"])
-        if not result:
-            click.echo(f"         LLM failed — skipping")
-            continue
-
-        # Merge tags
-        existing = set(t.strip() for t in existing_tags if t)
-        suggested = result.get("suggested_tags", [])
-        if isinstance(suggested, str):
-            suggested = [t.strip() for t in suggested.split(",") if t.strip()]
-        new_tags = set(t.lower().replace(" ", "-") for t in suggested if t)
-        merged = sorted(existing | new_tags)
-        merged_str = ",".join(merged)
-
-        db.update_tags(m["content_hash"], merged_str)
-        added = new_tags - existing
-        click.echo(f"         Added: {', '.join(added) if added else '(no new tags)'}")
-        tagged_count += 1
+    click.echo(f"Found {len(memories)} memories with fewer than 5 tags. Extracting entities via LLM...\n")
+
+    to_tag = [
+        (m, [t.strip() for t in (m["tags"] or "").split(",") if t.strip()])
+        for m in memories
+    ]
+
+    # Results stream in as they are generated; tag updates are committed every
+    # TAG_COMMIT_BATCH results, never while holding the lock across inference
+    results = iter_tag_memory(model_name, [m["content"] for m, _ in to_tag])
+
+    pending = []
+    tagged = 0
+
+    def flush():
+        nonlocal tagged
+        with db.transaction():
+            for content_hash, merged_str in pending:
+                db.update_tags(content_hash, merged_str)
+        tagged += len(pending)
+        pending.clear()
+
+    try:
+        for (m, existing_tags), result in zip(to_tag, results):
+            click.echo(f"  [{m['id']}] Tagging: {m['content'][:80]}...")
+
+            if not result:
+                click.echo(f"         LLM failed — skipping")
+                continue
+
+            # Merge tags
+            existing = set(t.strip() for t in existing_tags if t)
+            suggested = result.get("suggested_tags", [])
+            if isinstance(suggested, str):
+                suggested = [t.strip() for t in suggested.split(",") if t.strip()]
+            new_tags = set(t.lower().replace(" ", "-") for t in suggested if t)
+            merged = sorted(existing | new_tags)
+            merged_str = ",".join(merged)
+
+            pending.append((m["content_hash"], merged_str))
+            added = new_tags - existing
+            click.echo(f"         Added: {', '.join(added) if added else '(no new tags)'}")
+
+            if len(pending) >= TAG_COMMIT_BATCH:
+                flush()
+    finally:
+        # Also runs on Ctrl-C or a model error, so finished tags aren't lost
+        if pending:
+            flush()
+        db.close()
 
-    db.close()
-    click.echo(f"\nTagged {tagged_count} memories.")
+    click.echo(f"\nTagged {tagged} memories.")
@@ -3,13 +3,21 @@
 import hashlib
 import json
 import os
+import shutil
 import sqlite3
 import time
+import uuid
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
 
+try:
+    import pyfakefs  # noqa: F401  (provides the `fs` fixture)
+    HAS_PYFAKEFS = True
+except ImportError:
+    HAS_PYFAKEFS = False
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
@@ -21,101 +29,159 @@ DEFAULT_MODEL = "mlx-community/Mistral-7B-Instruct-v0.3-4bit"
 # ---------------------------------------------------------------------------
 # Temporary database that mirrors the real schema
 # ---------------------------------------------------------------------------
+SCHEMA_SQL = """
+    CREATE TABLE metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    INSERT INTO metadata (key, value) VALUES ('distance_metric', 'cosine');
+
+    CREATE TABLE memories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        content_hash TEXT UNIQUE NOT NULL,
+        content TEXT NOT NULL,
+        tags TEXT,
+        memory_type TEXT,
+        metadata TEXT,
+        created_at REAL,
+        updated_at REAL,
+        created_at_iso TEXT,
+        updated_at_iso TEXT,
+        deleted_at REAL DEFAULT NULL
+    );
+    CREATE INDEX idx_content_hash ON memories(content_hash);
+    CREATE INDEX idx_created_at ON memories(created_at);
+    CREATE INDEX idx_memory_type ON memories(memory_type);
+    CREATE INDEX idx_deleted_at ON memories(deleted_at);
+
+    CREATE TABLE memory_graph (
+        source_hash TEXT NOT NULL,
+        target_hash TEXT NOT NULL,
+        similarity REAL NOT NULL,
+        connection_types TEXT NOT NULL,
+        metadata TEXT,
+        created_at REAL NOT NULL,
+        relationship_type TEXT DEFAULT 'related',
+        PRIMARY KEY (source_hash, target_hash)
+    );
+    CREATE INDEX idx_graph_source ON memory_graph(source_hash);
+    CREATE INDEX idx_graph_target ON memory_graph(target_hash);
+"""
+
+
 @pytest.fixture
 def tmp_db(tmp_path):
     """Create a fresh SQLite DB with the exact same schema as memory.db."""
     db_path = str(tmp_path / "test_memory.db")
     conn = sqlite3.connect(db_path)
     conn.execute("PRAGMA journal_mode=WAL")
-    conn.executescript("""
-        CREATE TABLE metadata (
-            key TEXT PRIMARY KEY,
-            value TEXT NOT NULL
-        );
-        INSERT INTO metadata (key, value) VALUES ('distance_metric', 'cosine');
-
-        CREATE TABLE memories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content_hash TEXT UNIQUE NOT NULL,
-            content TEXT NOT NULL,
-            tags TEXT,
-            memory_type TEXT,
-            metadata TEXT,
-            created_at REAL,
-            updated_at REAL,
-            created_at_iso TEXT,
-            updated_at_iso TEXT,
-            deleted_at REAL DEFAULT NULL
-        );
-        CREATE INDEX idx_content_hash ON memories(content_hash);
-        CREATE INDEX idx_created_at ON memories(created_at);
-        CREATE INDEX idx_memory_type ON memories(memory_type);
-        CREATE INDEX idx_deleted_at ON memories(deleted_at);
-
-        CREATE TABLE memory_graph (
-            source_hash TEXT NOT NULL,
-            target_hash TEXT NOT NULL,
-            similarity REAL NOT NULL,
-            connection_types TEXT NOT NULL,
-            metadata TEXT,
-            created_at REAL NOT NULL,
-            relationship_type TEXT DEFAULT 'related',
-            PRIMARY KEY (source_hash, target_hash)
-        );
-        CREATE INDEX idx_graph_source ON memory_graph(source_hash);
-        CREATE INDEX idx_graph_target ON memory_graph(target_hash);
-    """)
+    conn.executescript(SCHEMA_SQL)
     conn.commit()
     conn.close()
     return db_path
 
 
 @pytest.fixture
-def populated_db(tmp_db):
-    """tmp_db pre-loaded with 5 sample memories of different types."""
+def fresh_db(tmp_db):
+    """Open MemoryDB on an empty tmp_db, closed at teardown even if the test fails."""
+    from hippoclaudus.db_bridge import MemoryDB
+
+    db = MemoryDB(tmp_db)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def shared_mem_db():
+    """URI of a shared-cache in-memory DB with the memory.db schema.
+
+    Every MemoryDB opened on the URI (from any thread) sees the same data, with
+    no journal or fsync. The fixture holds a connection open so the DB lives
+    for the whole test.
+    """
+    uri = f"file:hippo-{uuid.uuid4().hex}?mode=memory&cache=shared"
+    keeper = sqlite3.connect(uri, uri=True)
+    keeper.executescript(SCHEMA_SQL)
+    keeper.commit()
+    yield uri
+    keeper.close()
+
+
+@pytest.fixture(scope="session")
+def _populated_template():
+    """In-memory DB seeded once per session with 5 sample memories of different types.
+
+    populated_db clones this with the sqlite backup API instead of
+    re-running store_memory for every test.
+    """
     import sys
     sys.path.insert(0, str(MCP_ROOT))
     from hippoclaudus.db_bridge import MemoryDB, Memory
 
-    db = MemoryDB(tmp_db)
+    db = MemoryDB(":memory:")
+    db.conn.executescript(SCHEMA_SQL)
     samples = [
-        Memory(
+        dict(
             content="James and Dana discussed DeCue funding strategy for Q1",
             tags="james,dana,decue,funding,strategy",
             memory_type="observation",
             metadata={"source": "test"},
         ),
-        Memory(
+        dict(
             content="[State Delta] Migrated infrastructure from iMac to Mac Mini M4",
             tags="infrastructure,mac-mini,migration,state-delta",
             memory_type="state_delta",
             metadata={"entities": {"people": ["James"], "projects": ["DeCue"], "tools": ["Mac Mini"]},
                        "open_threads": ["Phase 3 planning"], "source": "hippo-consolidate"},
         ),
-        Memory(
+        dict(
             content="Seth proposed using Rust for the backend rewrite",
             tags="seth,rust,backend,proposal",
             memory_type="observation",
             metadata={"source": "test"},
         ),
-        Memory(
+        dict(
             content="Vera asked about internship timeline at Blue Shirt IR",
             tags="vera,blue-shirt-ir,internship",
             memory_type="observation",
             metadata={"source": "test"},
         ),
-        Memory(
+        dict(
             content="Dana recommended a plain-spoken communication approach for investor decks",
             tags="dana,communication,investor,decue",
             memory_type="observation",
             metadata={"source": "test"},
         ),
     ]
-    for m in samples:
-        db.store_memory(m)
-        time.sleep(0.01)  # Ensure distinct timestamps for ordering tests
+    # Distinct, strictly increasing timestamps for ordering tests (no sleeping)
+    base = time.time() - len(samples)
+    for i, fields in enumerate(samples):
+        ts = base + i
+        db.store_memory(Memory(created_at=ts, updated_at=ts, **fields))
+    yield db.conn
     db.close()
-    return tmp_db
+
+
+@pytest.fixture(scope="module")
+def populated_db(_populated_template, tmp_path_factory):
+    """On-disk copy of the seeded template DB, shared by every test in a module.
+
+    Read-only: tests that write to the DB must use mutable_populated_db.
+    """
+    db_path = str(tmp_path_factory.mktemp("populated") / "test_memory.db")
+    conn = sqlite3.connect(db_path)
+    _populated_template.backup(conn)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+    return db_path
+
+
+@pytest.fixture
+def mutable_populated_db(populated_db, tmp_path):
+    """Private per-test copy of populated_db for tests that write to it."""
+    db_path = str(tmp_path / "test_memory.db")
+    shutil.copy(populated_db, db_path)
+    return db_path
 
 
 @pytest.fixture
@@ -155,11 +221,10 @@ def open_questions_file(tmp_path):
     return oq
 
 
-@pytest.fixture
-def long_term_dir(tmp_path):
-    """Create a fake long-term directory with relationship files."""
-    lt = tmp_path / "long-term"
-    lt.mkdir()
+@pytest.fixture(scope="module")
+def long_term_dir(tmp_path_factory):
+    """Fake long-term directory with relationship files, shared per module (read-only)."""
+    lt = tmp_path_factory.mktemp("long-term")
     (lt / "Claude_Relationships_James.md").write_text(
         "# James\n\nJames is the founder of DeCue Technologies.\n"
         "He communicates directly and values shipping.\n"
@@ -170,10 +235,111 @@ def long_term_dir(tmp_path):
     return lt
 
 
+# ---------------------------------------------------------------------------
+# Scratch directories for installer tests
+# ---------------------------------------------------------------------------
+@pytest.fixture
+def scratch_dir(request):
+    """Empty directory for tests that only check file logic, not disk semantics.
+
+    Backed by pyfakefs's in-memory filesystem when it is installed, so no
+    real syscalls are made; falls back to tmp_path otherwise.
+    """
+    if not HAS_PYFAKEFS:
+        return request.getfixturevalue("tmp_path")
+    fs = request.getfixturevalue("fs")
+    fs.create_dir("/t")
+    return Path("/t")
+
+
+@pytest.fixture
+def install_paths(tmp_path):
+    """resolve_install_paths() rooted at tmp_path, on the real disk."""
+    from hippoclaudus.platform import resolve_install_paths
+
+    return resolve_install_paths(tmp_path)
+
+
+# ---------------------------------------------------------------------------
+# Pre-installed tree for installer integration tests
+# ---------------------------------------------------------------------------
+ORIGINAL_CLAUDE_CONFIG = '{"mcpServers": {"existing": {"command": "node"}}}'
+
+
+def _build_install(root, original_config):
+    """Run run_install into root (Claude/, config/, .hippoclaudus) with installs mocked."""
+    import sys
+    sys.path.insert(0, str(MCP_ROOT))
+    from hippoclaudus.installer import run_install
+
+    config_dir = root / "config"
+    config_dir.mkdir()
+    config_path = config_dir / "claude_desktop_config.json"
+    if original_config is not None:
+        config_path.write_text(original_config)
+
+    with patch("hippoclaudus.installer.create_venv"), \
+         patch("hippoclaudus.installer.install_mcp_memory_service"), \
+         patch("hippoclaudus.installer.verify_mcp_install", return_value=True), \
+         patch("hippoclaudus.installer.get_claude_config_path", return_value=config_path), \
+         patch("hippoclaudus.installer.get_dotfile_path", return_value=root / ".hippoclaudus"):
+        run_install(base_path=root / "Claude")
+    return root
+
+
+def _copy_install(template, tmp_path, monkeypatch):
+    """Copy a prebuilt install into tmp_path and point the installer at the copy.
+
+    The dotfile is re-pointed at the copy so run_uninstall(remove_data=True)
+    can never reach the shared template.
+    """
+    from hippoclaudus.platform import update_dotfile
+
+    shutil.copytree(template / "Claude", tmp_path / "Claude", dirs_exist_ok=True)
+    shutil.copytree(template / "config", tmp_path / "config", dirs_exist_ok=True)
+    dotfile = tmp_path / ".hippoclaudus"
+    shutil.copy2(template / ".hippoclaudus", dotfile)
+    update_dotfile(dotfile, install_path=str(tmp_path / "Claude"))
+
+    config_path = tmp_path / "config" / "claude_desktop_config.json"
+    monkeypatch.setattr("hippoclaudus.installer.get_claude_config_path", lambda: config_path)
+    monkeypatch.setattr("hippoclaudus.installer.get_dotfile_path", lambda: dotfile)
+    return {"base": tmp_path / "Claude", "config": config_path, "dotfile": dotfile}
+
+
+@pytest.fixture(scope="session")
+def _prebuilt_install(tmp_path_factory):
+    """run_install once per session over a pre-existing Claude config (so a backup exists).
+
+    Never modify it directly -- installed_tree hands out per-test copies.
+    """
+    return _build_install(tmp_path_factory.mktemp("prebuilt-install"), ORIGINAL_CLAUDE_CONFIG)
+
+
+@pytest.fixture(scope="session")
+def _prebuilt_fresh_install(tmp_path_factory):
+    """run_install once per session with no prior Claude config, so no backup is taken."""
+    return _build_install(tmp_path_factory.mktemp("prebuilt-fresh-install"), None)
+
+
+@pytest.fixture
+def installed_tree(_prebuilt_install, tmp_path, monkeypatch):
+    """Private copy of _prebuilt_install, with the installer pointed at it."""
+    return _copy_install(_prebuilt_install, tmp_path, monkeypatch)
+
+
+@pytest.fixture
+def fresh_installed_tree(_prebuilt_fresh_install, tmp_path, monkeypatch):
+    """Private copy of _prebuilt_fresh_install, with the installer pointed at it."""
+    return _copy_install(_prebuilt_fresh_install, tmp_path, monkeypatch)
+
+
 # ---------------------------------------------------------------------------
 # Mock LLM response constants
 # ---------------------------------------------------------------------------
-MOCK_CONSOLIDATION_RESPONSE = json.dumps({
+# *_DICT is the parsed form, built once; tests that mock past extract_json use it
+# directly. None of the code under test mutates these results.
+MOCK_CONSOLIDATION_DICT = {
     "state_delta": "Infrastructure migrated from iMac to Mac Mini. All MCP services confirmed working.",
     "entities": {
         "people": ["James"],
@@ -183,31 +349,35 @@ MOCK_CONSOLIDATION_RESPONSE = json.dumps({
     "security_context": "none",
     "emotional_signals": "positive, productive energy",
     "open_threads": ["Phase 3 planning", "Automated scheduling"]
-})
+}
+MOCK_CONSOLIDATION_RESPONSE = json.dumps(MOCK_CONSOLIDATION_DICT)
 
-MOCK_TAG_RESPONSE = json.dumps({
+MOCK_TAG_DICT = {
     "people": ["James", "Dana"],
     "projects": ["DeCue"],
     "tools": ["Python", "SQLite"],
     "topics": ["memory management", "architecture"],
     "suggested_tags": ["james", "dana", "decue", "python", "sqlite", "memory-management"]
-})
+}
+MOCK_TAG_RESPONSE = json.dumps(MOCK_TAG_DICT)
 
-MOCK_MERGE_RESPONSE = json.dumps({
+MOCK_MERGE_DICT = {
     "relationship": "duplicate",
     "keep": "B",
     "merged_content": "",
     "reasoning": "Memory B is a more recent version of the same information."
-})
+}
+MOCK_MERGE_RESPONSE = json.dumps(MOCK_MERGE_DICT)
 
-MOCK_COMM_PROFILE_RESPONSE = json.dumps({
+MOCK_COMM_PROFILE_DICT = {
     "tone": "direct, analytical",
     "priorities": ["shipping product", "technical excellence"],
     "decision_style": "data-driven with gut checks",
     "response_patterns": "quick responses, iterative",
     "key_phrases": ["ship it", "what's the blocker"],
     "working_relationship": "collaborative, high trust"
-})
+}
+MOCK_COMM_PROFILE_RESPONSE = json.dumps(MOCK_COMM_PROFILE_DICT)
 
 MOCK_PREDICT_RESPONSE = (
     "# PRELOAD -- Session Briefing\n"
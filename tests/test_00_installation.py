@@ -5,6 +5,7 @@ Slow tests (marked @pytest.mark.slow) actually load Mistral and run inference.
 """
 
 import os
+import sqlite3
 import sys
 from pathlib import Path
 
@@ -86,33 +87,70 @@ class TestImports:
 # Fast: Live memory.db sanity
 # ---------------------------------------------------------------------------
 
+LIVE_DB = MCP_ROOT / "data" / "memory.db"
+LIVE_DB_CACHE_KEY = "hippoclaudus/live_db"
+
+
+@pytest.fixture(scope="session")
+def live_db_stats(request):
+    """Diagnostics for the live DB, queried once and reused while it is unchanged.
+
+    Skips (rather than fails) on fresh clones / CI where no live DB exists.
+    Results persist in the pytest cache keyed on the DB's mtime_ns plus the
+    -wal file's mtime_ns and size: in WAL mode writes land in memory.db-wal
+    and leave the main file untouched until a checkpoint.
+    """
+    if not LIVE_DB.exists():
+        pytest.skip(f"Live DB not present: {LIVE_DB}")
+
+    cache = getattr(request.config, "cache", None)
+    key = [str(LIVE_DB), LIVE_DB.stat().st_mtime_ns]
+    wal = LIVE_DB.with_name(LIVE_DB.name + "-wal")
+    if wal.exists():
+        wal_stat = wal.stat()
+        key += [wal_stat.st_mtime_ns, wal_stat.st_size]
+    if cache is not None:
+        cached = cache.get(LIVE_DB_CACHE_KEY, None)
+        if cached and cached.get("key") == key:
+            return cached["stats"]
+
+    conn = sqlite3.connect(str(LIVE_DB))
+    try:
+        stats = {
+            "memory_count": conn.execute(
+                "SELECT COUNT(*) FROM memories WHERE deleted_at IS NULL"
+            ).fetchone()[0],
+            "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0],
+            "tables": [r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            ).fetchall()],
+        }
+    finally:
+        conn.close()
+
+    if cache is not None:
+        cache.set(LIVE_DB_CACHE_KEY, {"key": key, "stats": stats})
+    return stats
+
+
 class TestLiveDB:
     """Verify the production memory.db is present and sane."""
 
-    LIVE_DB = MCP_ROOT / "data" / "memory.db"
+    def test_db_is_sqlite(self, live_db_stats):
+        with open(LIVE_DB, "rb") as f:
+            header = f.read(16)
+        assert header == b"SQLite format 3\x00", f"Not a SQLite database: {LIVE_DB}"
 
-    def test_db_exists(self):
-        assert self.LIVE_DB.exists(), f"Live DB missing: {self.LIVE_DB}"
-
-    def test_db_has_memories(self):
-        import sqlite3
-        conn = sqlite3.connect(str(self.LIVE_DB))
-        count = conn.execute("SELECT COUNT(*) FROM memories WHERE deleted_at IS NULL").fetchone()[0]
-        conn.close()
+    def test_db_has_memories(self, live_db_stats):
+        count = live_db_stats["memory_count"]
         assert count >= 3, f"Live DB has only {count} memories, expected >= 3"
 
-    def test_db_wal_mode(self):
-        import sqlite3
-        conn = sqlite3.connect(str(self.LIVE_DB))
-        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
-        conn.close()
+    def test_db_wal_mode(self, live_db_stats):
+        mode = live_db_stats["journal_mode"]
         assert mode == "wal", f"Expected WAL mode, got {mode}"
 
-    def test_db_has_required_tables(self):
-        import sqlite3
-        conn = sqlite3.connect(str(self.LIVE_DB))
-        tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
-        conn.close()
+    def test_db_has_required_tables(self, live_db_stats):
+        tables = live_db_stats["tables"]
         for expected in ["memories", "memory_graph", "metadata"]:
             assert expected in tables, f"Missing table: {expected}"
 
@@ -113,65 +113,52 @@ class TestAccessScore:
 # composite_score
 # ---------------------------------------------------------------------------
 
-class TestCompositeScore:
-
-    def test_perfect_memory(self):
-        """Brand new, high similarity, many accesses → near max."""
-        now = time.time()
-        score = composite_score(
-            cosine_sim=1.0,
-            created_at=now,
-            access_count=50,
-            weights=ScoringWeights(relevance=0.6, recency=0.3, access=0.1, half_life_days=14.0),
-        )
-        assert score > 0.9
+# Shared across the table-driven cases below so each case does no setup work
+NOW = time.time()
+ONE_YEAR = 365 * 86400
+
+PAPER_WEIGHTS = ScoringWeights(relevance=0.6, recency=0.3, access=0.1, half_life_days=14.0)
+RELEVANCE_ONLY = ScoringWeights(relevance=1.0, recency=0.0, access=0.0)
+EXTREME_WEIGHTS = ScoringWeights(relevance=5.0, recency=5.0, access=5.0)
+
+CHECKS = {
+    ">": lambda score, bound: score > bound,
+    "<": lambda score, bound: score < bound,
+    "<=": lambda score, bound: score <= bound,
+    "~": lambda score, bound: abs(score - bound) < 0.01,
+    "in": lambda score, bound: bound[0] <= score <= bound[1],
+}
+
+COMPOSITE_CASES = [
+    # Brand new, high similarity, many accesses → near max
+    pytest.param(1.0, 0, 50, PAPER_WEIGHTS, (">", 0.9), id="perfect_memory"),
+    # Very old, zero similarity, no accesses → near zero
+    pytest.param(0.0, ONE_YEAR, 0, None, ("<", 0.05), id="worthless_memory"),
+    # Relevance-only weights should ignore recency/access
+    pytest.param(0.8, ONE_YEAR, 0, RELEVANCE_ONLY, ("~", 0.8), id="custom_weights"),
+    # Cosine sim > 1.0 clamped: 0.6 * 1.0 + 0.3 * 1.0 + 0.1 * 0.0 = 0.9
+    pytest.param(1.5, 0, 0, None, ("<=", 1.0), id="cosine_sim_clamped"),
+    # Cosine sim < 0 clamped: 0.6 * 0.0 + 0.3 * 1.0 + 0.1 * 0.0 = 0.3
+    pytest.param(-0.5, 0, 0, None, ("~", 0.3), id="cosine_sim_negative_clamped"),
+    pytest.param(
+        1.0, 0, 50, EXTREME_WEIGHTS, ("in", (0.0, 1.0)), id="extreme_weights_no_clamping",
+        marks=pytest.mark.xfail(reason="Known: No output clamping with extreme weights"),
+    ),
+]
 
-    def test_worthless_memory(self):
-        """Very old, zero similarity, no accesses → near zero."""
-        now = time.time()
-        score = composite_score(
-            cosine_sim=0.0,
-            created_at=now - (365 * 86400),
-            access_count=0,
-        )
-        assert score < 0.05
 
-    def test_custom_weights(self):
-        """Relevance-only weights should ignore recency/access."""
-        now = time.time()
-        score = composite_score(
-            cosine_sim=0.8,
-            created_at=now - (365 * 86400),  # very old
-            access_count=0,
-            weights=ScoringWeights(relevance=1.0, recency=0.0, access=0.0),
-        )
-        assert abs(score - 0.8) < 0.01
-
-    def test_cosine_sim_clamped(self):
-        """Cosine sim > 1.0 should be clamped to 1.0."""
-        now = time.time()
-        score = composite_score(cosine_sim=1.5, created_at=now, access_count=0)
-        # With default weights: 0.6 * 1.0 (clamped) + 0.3 * 1.0 (new) + 0.1 * 0.0 = 0.9
-        assert score <= 1.0
-
-    def test_cosine_sim_negative_clamped(self):
-        """Cosine sim < 0 should be clamped to 0.0."""
-        now = time.time()
-        score = composite_score(cosine_sim=-0.5, created_at=now, access_count=0)
-        # 0.6 * 0.0 + 0.3 * 1.0 + 0.1 * 0.0 = 0.3
-        assert abs(score - 0.3) < 0.01
+class TestCompositeScore:
 
-    @pytest.mark.xfail(reason="Known: No output clamping with extreme weights")
-    def test_extreme_weights_no_clamping(self):
-        """Extreme weights could produce score > 1.0 since there's no final clamp."""
-        now = time.time()
+    @pytest.mark.parametrize("sim,age_seconds,acc,weights,check", COMPOSITE_CASES)
+    def test_composite(self, sim, age_seconds, acc, weights, check):
         score = composite_score(
-            cosine_sim=1.0,
-            created_at=now,
-            access_count=50,
-            weights=ScoringWeights(relevance=5.0, recency=5.0, access=5.0),
+            cosine_sim=sim,
+            created_at=NOW - age_seconds,
+            access_count=acc,
+            weights=weights,
         )
-        assert 0.0 <= score <= 1.0
+        op, bound = check
+        assert CHECKS[op](score, bound), f"score={score} failed {op} {bound}"
 
     def test_default_weights(self):
         """Default weights should sum to 1.0."""
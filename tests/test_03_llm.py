@@ -3,14 +3,17 @@
 import json
 import sys
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 import pytest
 
 MCP_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(MCP_ROOT))
 
-from hippoclaudus.llm import extract_json, CONSOLIDATION_PROMPT, ENTITY_TAG_PROMPT, COMM_PROFILE_PROMPT
+from hippoclaudus.llm import (
+    extract_json, batch_run_prompt, iter_run_prompt, iter_tag_memory, _in_background,
+    CONSOLIDATION_PROMPT, ENTITY_TAG_PROMPT, COMM_PROFILE_PROMPT,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -83,14 +86,28 @@ class TestExtractJsonFailures:
         result = extract_json("{'key': 'value'}")
         assert result is None
 
-    @pytest.mark.xfail(reason="Known: Greedy regex grabs both objects as one invalid block")
     def test_two_json_objects(self):
-        """Two JSON objects in one string — greedy regex may grab both."""
+        """Two JSON objects in one string — the first balanced object wins."""
         text = '{"a": 1} and also {"b": 2}'
         result = extract_json(text)
-        # Ideally returns first one, but greedy regex grabs everything from first { to last }
         assert result == {"a": 1}
 
+    def test_braces_inside_strings(self):
+        """Braces inside string values must not affect depth tracking."""
+        text = 'Result: {"code": "if (x) { return \\"}\\"; }", "n": 1} trailing }'
+        result = extract_json(text)
+        assert result == {"code": 'if (x) { return "}"; }', "n": 1}
+
+    def test_skips_malformed_object_before_valid_one(self):
+        """A malformed {...} is skipped; decoding resumes at the next '{'."""
+        text = '{not json} then {"ok": true}'
+        assert extract_json(text) == {"ok": True}
+
+    def test_too_deeply_nested(self):
+        """Nesting past the decoder's recursion limit gives None, not a crash."""
+        text = '{"a": ' * 5000 + "1" + "}" * 5000
+        assert extract_json(text) is None
+
     def test_array_not_object(self):
         """extract_json only looks for objects {}, not arrays []."""
         result = extract_json("[1, 2, 3]")
@@ -127,6 +144,89 @@ class TestExtractJsonStress:
         assert result is not None
         assert result["level"] == 0
 
+    def test_keys_filters_small_json(self):
+        text = json.dumps({"state_delta": "x", "entities": {}, "extra": [1, 2]})
+        assert extract_json(text, keys={"state_delta", "entities"}) == {"state_delta": "x", "entities": {}}
+
+    def test_keys_large_text_matches_small(self):
+        """Size doesn't change which object is picked: a leading non-JSON {...} is skipped."""
+        data = {f"key_{i}": f"value_{i}" * 20 for i in range(1000)}
+        data["state_delta"] = "summary"
+        data["score"] = 0.5
+        keys = {"state_delta", "score", "missing"}
+        small = "{not json} " + json.dumps({"state_delta": "summary", "score": 0.5})
+        large = "{not json} " + json.dumps(data)
+        assert len(large) > 64 * 1024
+        expected = {"state_delta": "summary", "score": 0.5}
+        assert extract_json(small, keys=keys) == expected
+        assert extract_json(large, keys=keys) == expected
+
+
+# ---------------------------------------------------------------------------
+# batch_run_prompt
+# ---------------------------------------------------------------------------
+
+class TestBatchRunPrompt:
+
+    def test_empty_batch_skips_backend(self):
+        with patch("hippoclaudus.llm.detect_backend") as mock_detect:
+            assert batch_run_prompt("mock-model", []) == []
+            mock_detect.assert_not_called()
+
+    def test_llama_cpp_preserves_order(self):
+        with patch("hippoclaudus.llm.detect_backend", return_value="llama_cpp"), \
+             patch("hippoclaudus.llm._run_llama_cpp", side_effect=lambda m, p, t, temp: p.upper()):
+            assert batch_run_prompt("mock-model", ["a", "b", "c"]) == ["A", "B", "C"]
+
+    def test_mlx_dispatches_one_batch(self):
+        with patch("hippoclaudus.llm.detect_backend", return_value="mlx"), \
+             patch("hippoclaudus.llm._run_mlx_batch", return_value=["x", "y"]) as mock_batch:
+            assert batch_run_prompt("mock-model", ["p1", "p2"], max_tokens=64, temp=0.1) == ["x", "y"]
+            mock_batch.assert_called_once_with("mock-model", ["p1", "p2"], 64, 0.1)
+
+    def test_iter_tag_memory_parses_each_response(self):
+        with patch("hippoclaudus.llm.iter_run_prompt", return_value=iter(['{"people": ["A"]}', "no json"])) as mock_rp:
+            results = list(iter_tag_memory("mock-model", ["first memory", "second memory"]))
+            prompts = mock_rp.call_args[0][1]
+        assert results == [{"people": ["A"]}, None]
+        assert "first memory" in prompts[0] and "second memory" in prompts[1]
+
+
+class TestBackgroundIteration:
+
+    def test_preserves_order(self):
+        assert list(_in_background(iter(range(50)))) == list(range(50))
+
+    def test_producer_runs_ahead_of_consumer(self):
+        import threading
+        second_started = threading.Event()
+
+        def produce():
+            yield "first"
+            second_started.set()
+            yield "second"
+
+        it = _in_background(produce())
+        assert next(it) == "first"
+        # While the caller holds "first", the worker is already producing "second"
+        assert second_started.wait(timeout=5)
+        assert next(it) == "second"
+
+    def test_producer_error_propagates(self):
+        def produce():
+            yield 1
+            raise RuntimeError("backend exploded")
+
+        it = _in_background(produce())
+        assert next(it) == 1
+        with pytest.raises(RuntimeError, match="exploded"):
+            next(it)
+
+    def test_llama_cpp_streams_in_background(self):
+        with patch("hippoclaudus.llm.detect_backend", return_value="llama_cpp"), \
+             patch("hippoclaudus.llm._run_llama_cpp", side_effect=lambda m, p, t, temp: p * 2):
+            assert list(iter_run_prompt("mock-model", ["a", "b"])) == ["aa", "bb"]
+
 
 # ---------------------------------------------------------------------------
 # Prompt templates
@@ -170,41 +270,43 @@ class TestPromptTemplates:
 
 class TestModelCacheMock:
 
-    def test_cache_loads_once(self):
-        """get_model should call load() only once per model name."""
+    @pytest.fixture
+    def fake_mlx(self, monkeypatch):
+        """Inject a recording fake MLX loader with an empty model cache."""
         import hippoclaudus.llm as llm_module
-        # Save and reset cache
-        old_cache = llm_module._model_cache.copy()
-        llm_module._model_cache.clear()
+        calls = []
 
-        mock_model = MagicMock()
-        mock_tokenizer = MagicMock()
+        def loader(name):
+            calls.append(name)
+            return (object(), object())
 
-        with patch.object(llm_module, "load", return_value=(mock_model, mock_tokenizer)) as mock_load:
-            m1, t1 = llm_module.get_model("test-model")
-            m2, t2 = llm_module.get_model("test-model")
+        monkeypatch.setattr(llm_module, "_backend", "mlx")
+        monkeypatch.setitem(llm_module.MODEL_LOADERS, "mlx", loader)
+        llm_module.clear_model_cache()
+        yield calls
+        llm_module.clear_model_cache()
 
-            mock_load.assert_called_once_with("test-model")
-            assert m1 is m2
-            assert t1 is t2
+    def test_cache_loads_once(self, fake_mlx):
+        """get_model should call load() only once per model name."""
+        from hippoclaudus.llm import get_model
+        m1, t1 = get_model("test-model")
+        m2, t2 = get_model("test-model")
 
-        # Restore cache
-        llm_module._model_cache.clear()
-        llm_module._model_cache.update(old_cache)
+        assert fake_mlx == ["test-model"]
+        assert m1 is m2
+        assert t1 is t2
 
-    def test_different_models_cached_separately(self):
+    def test_different_models_cached_separately(self, fake_mlx):
         """Different model names should have separate cache entries."""
-        import hippoclaudus.llm as llm_module
-        old_cache = llm_module._model_cache.copy()
-        llm_module._model_cache.clear()
-
-        mock_a = (MagicMock(), MagicMock())
-        mock_b = (MagicMock(), MagicMock())
-
-        with patch.object(llm_module, "load", side_effect=[mock_a, mock_b]) as mock_load:
-            llm_module.get_model("model-a")
-            llm_module.get_model("model-b")
-            assert mock_load.call_count == 2
-
-        llm_module._model_cache.clear()
-        llm_module._model_cache.update(old_cache)
+        from hippoclaudus.llm import get_model
+        get_model("model-a")
+        get_model("model-b")
+        assert fake_mlx == ["model-a", "model-b"]
+
+    def test_cache_is_bounded(self, fake_mlx):
+        """Least recently used model is evicted once MODEL_CACHE_SIZE is exceeded."""
+        from hippoclaudus.llm import get_model, MODEL_CACHE_SIZE
+        for i in range(MODEL_CACHE_SIZE + 1):
+            get_model(f"model-{i}")
+        get_model("model-0")  # evicted, so loaded again
+        assert len(fake_mlx) == MODEL_CACHE_SIZE + 2
@@ -1,6 +1,5 @@
 """Consolidation pipeline tests — mocked LLM + real Mistral."""
 
-import json
 import sys
 import time
 from pathlib import Path
@@ -11,7 +10,7 @@ import pytest
 MCP_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(MCP_ROOT))
 
-from tests.conftest import MOCK_CONSOLIDATION_RESPONSE, MCP_ROOT as CONF_ROOT
+from tests.conftest import MOCK_CONSOLIDATION_DICT, MCP_ROOT as CONF_ROOT
 
 from hippoclaudus.db_bridge import MemoryDB, Memory
 from hippoclaudus.consolidator import run_consolidation, run_reflection
@@ -26,7 +25,7 @@ class TestConsolidationMocked:
     def test_full_pipeline(self, tmp_db, sample_session_log):
         """Mocked LLM → should store a state_delta memory."""
         with patch("hippoclaudus.consolidator.consolidate_session") as mock_llm:
-            mock_llm.return_value = json.loads(MOCK_CONSOLIDATION_RESPONSE)
+            mock_llm.return_value = MOCK_CONSOLIDATION_DICT
             run_consolidation(
                 model_name="mock-model",
                 db_path=tmp_db,
@@ -73,7 +72,7 @@ class TestConsolidationMocked:
     def test_tags_from_entities(self, tmp_db, sample_session_log):
         """Tags should be built from entities in the LLM response."""
         with patch("hippoclaudus.consolidator.consolidate_session") as mock_llm:
-            mock_llm.return_value = json.loads(MOCK_CONSOLIDATION_RESPONSE)
+            mock_llm.return_value = MOCK_CONSOLIDATION_DICT
             run_consolidation(
                 model_name="mock-model",
                 db_path=tmp_db,
@@ -120,7 +119,7 @@ class TestReflectionMocked:
     def test_reflection_no_store(self, sample_session_log):
         """Reflection should NOT store anything — it's a dry run."""
         with patch("hippoclaudus.consolidator.consolidate_session") as mock_llm:
-            mock_llm.return_value = json.loads(MOCK_CONSOLIDATION_RESPONSE)
+            mock_llm.return_value = MOCK_CONSOLIDATION_DICT
             # run_reflection doesn't take db_path — it never writes
             run_reflection(
                 model_name="mock-model",
@@ -1,6 +1,5 @@
 """Entity tagging tests — single, batch, LLM failure handling."""
 
-import json
 import sys
 import time
 from pathlib import Path
@@ -11,7 +10,7 @@ import pytest
 MCP_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(MCP_ROOT))
 
-from tests.conftest import MOCK_TAG_RESPONSE
+from tests.conftest import MOCK_TAG_DICT
 
 from hippoclaudus.db_bridge import MemoryDB, Memory
 from hippoclaudus.tagger import run_tag_single, run_tag_all
@@ -23,19 +22,19 @@ from hippoclaudus.tagger import run_tag_single, run_tag_all
 
 class TestTagSingle:
 
-    def test_tag_single_memory(self, populated_db):
+    def test_tag_single_memory(self, mutable_populated_db):
         """Tag a specific memory — should merge old + new tags."""
-        db = MemoryDB(populated_db)
+        db = MemoryDB(mutable_populated_db)
         memories = db.get_all_memories()
         target_id = memories[0]["id"]
         original_tags = memories[0]["tags"]
         db.close()
 
         with patch("hippoclaudus.tagger.tag_memory") as mock_llm:
-            mock_llm.return_value = json.loads(MOCK_TAG_RESPONSE)
-            run_tag_single("mock-model", populated_db, target_id)
+            mock_llm.return_value = MOCK_TAG_DICT
+            run_tag_single("mock-model", mutable_populated_db, target_id)
 
-        db = MemoryDB(populated_db)
+        db = MemoryDB(mutable_populated_db)
         updated = db.get_all_memories()
         target = [m for m in updated if m["id"] == target_id][0]
         db.close()
@@ -69,37 +68,39 @@ class TestTagSingle:
 
 class TestTagAll:
 
-    def test_skips_well_tagged(self, populated_db):
+    def test_skips_well_tagged(self, mutable_populated_db):
         """Memories with 5+ tags should be skipped."""
         # Give one memory 6 tags so it's clearly above the >= 5 threshold
-        db = MemoryDB(populated_db)
+        db = MemoryDB(mutable_populated_db)
         memories = db.get_all_memories()
         db.update_tags(memories[0]["content_hash"], "a,b,c,d,e,f")
         db.close()
 
-        with patch("hippoclaudus.tagger.tag_memory") as mock_llm:
-            mock_llm.return_value = json.loads(MOCK_TAG_RESPONSE)
-            run_tag_all("mock-model", populated_db)
+        with patch("hippoclaudus.tagger.iter_tag_memory") as mock_llm:
+            mock_llm.side_effect = lambda model, contents: [MOCK_TAG_DICT] * len(contents)
+            run_tag_all("mock-model", mutable_populated_db)
 
-            # The populated_db has 5 memories. Memory #1 (James/Dana funding)
+            # The mutable_populated_db has 5 memories. Memory #1 (James/Dana funding)
             # already has 5 tags ("james,dana,decue,funding,strategy"), which
             # hits the >= 5 skip threshold. Plus the one we gave 6 tags above.
-            # So 2 are skipped, 3 are tagged.
-            assert mock_llm.call_count == 3
+            # So 2 are skipped, 3 are tagged — all in a single batched call.
+            assert mock_llm.call_count == 1
+            assert len(mock_llm.call_args[0][1]) == 3
 
-    def test_suggested_tags_as_string(self, populated_db):
+    def test_suggested_tags_as_string(self, mutable_populated_db):
         """Handle suggested_tags as comma-separated string instead of list."""
-        with patch("hippoclaudus.tagger.tag_memory") as mock_llm:
-            mock_llm.return_value = {
-                "people": ["James"],
-                "projects": [],
-                "tools": [],
-                "topics": [],
-                "suggested_tags": "james,leadership,strategy",  # string, not list
-            }
-            run_tag_all("mock-model", populated_db)
-
-        db = MemoryDB(populated_db)
+        result = {
+            "people": ["James"],
+            "projects": [],
+            "tools": [],
+            "topics": [],
+            "suggested_tags": "james,leadership,strategy",  # string, not list
+        }
+        with patch("hippoclaudus.tagger.iter_tag_memory") as mock_llm:
+            mock_llm.side_effect = lambda model, contents: [result] * len(contents)
+            run_tag_all("mock-model", mutable_populated_db)
+
+        db = MemoryDB(mutable_populated_db)
         memories = db.get_all_memories()
         db.close()
 
@@ -107,8 +108,37 @@ class TestTagAll:
         any_has_james = any("james" in (m["tags"] or "") for m in memories)
         assert any_has_james
 
+    def test_partial_llm_failure(self, mutable_populated_db):
+        """A None result for one memory should skip only that memory."""
+        with patch("hippoclaudus.tagger.iter_tag_memory") as mock_llm:
+            mock_llm.side_effect = lambda model, contents: [None] + [MOCK_TAG_DICT] * (len(contents) - 1)
+            run_tag_all("mock-model", mutable_populated_db)
+
+        db = MemoryDB(mutable_populated_db)
+        tagged = [m for m in db.get_all_memories() if "memory-management" in (m["tags"] or "")]
+        db.close()
+        assert len(tagged) == 3  # 4 eligible, first one failed
+
+    def test_interrupted_run_keeps_finished_tags(self, mutable_populated_db, monkeypatch):
+        """Tags committed before a model error survive it."""
+        monkeypatch.setattr("hippoclaudus.tagger.TAG_COMMIT_BATCH", 1)
+
+        def results(model, contents):
+            yield MOCK_TAG_DICT
+            yield MOCK_TAG_DICT
+            raise RuntimeError("model crashed")
+
+        with patch("hippoclaudus.tagger.iter_tag_memory", side_effect=results):
+            with pytest.raises(RuntimeError):
+                run_tag_all("mock-model", mutable_populated_db)
+
+        db = MemoryDB(mutable_populated_db)
+        tagged = [m for m in db.get_all_memories() if "memory-management" in (m["tags"] or "")]
+        db.close()
+        assert len(tagged) == 2
+
     def test_empty_db(self, tmp_db):
         """Empty database should not crash."""
-        with patch("hippoclaudus.tagger.tag_memory") as mock_llm:
+        with patch("hippoclaudus.tagger.iter_tag_memory") as mock_llm:
             run_tag_all("mock-model", tmp_db)
             mock_llm.assert_not_called()
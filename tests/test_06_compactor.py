@@ -11,10 +11,13 @@ import pytest
 MCP_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(MCP_ROOT))
 
-from tests.conftest import MOCK_MERGE_RESPONSE
+from tests.conftest import MOCK_MERGE_RESPONSE, MOCK_MERGE_DICT
 
 from hippoclaudus.db_bridge import MemoryDB, Memory
-from hippoclaudus.compactor import _similarity_simple, _merge_tags, _soft_delete, run_compact
+from hippoclaudus.compactor import (
+    _similarity_simple, _tokenize, _jaccard, _candidate_pairs,
+    _merge_tags, _soft_delete, run_compact,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -49,6 +52,55 @@ class TestJaccardSimilarity:
         assert _similarity_simple("hello", "hello") == 1.0
         assert _similarity_simple("hello", "world") == 0.0
 
+    def test_jaccard_matches_string_form(self):
+        a, b = "the quick brown fox", "the lazy brown dog"
+        assert _jaccard(_tokenize(a), _tokenize(b)) == _similarity_simple(a, b)
+
+    def test_tokenize_is_frozen(self):
+        assert _tokenize("Hello hello WORLD") == frozenset({"hello", "world"})
+
+    def test_tokenize_unicode_case_and_whitespace(self):
+        """Non-ASCII letters are case-folded and Unicode spaces split tokens."""
+        assert _tokenize("CAFÉ café\u00a0Über") == frozenset({"café", "über"})
+
+
+# ---------------------------------------------------------------------------
+# Candidate pair prefilter
+# ---------------------------------------------------------------------------
+
+class TestCandidatePairs:
+
+    def _brute_force(self, tokens, threshold):
+        return [
+            (i, j, _jaccard(tokens[i], tokens[j]))
+            for i in range(len(tokens))
+            for j in range(i + 1, len(tokens))
+            if _jaccard(tokens[i], tokens[j]) >= threshold
+        ]
+
+    @pytest.mark.parametrize("threshold", [0.0, 0.1, 0.3, 0.5, 0.8, 1.0])
+    def test_matches_full_pairwise_scan(self, threshold):
+        import random
+        rng = random.Random(threshold)
+        vocab = [f"w{k}" for k in range(25)]
+        texts = [" ".join(rng.sample(vocab, rng.randint(0, 8))) for _ in range(60)]
+        tokens = [_tokenize(t) for t in texts]
+        assert _candidate_pairs(tokens, threshold) == self._brute_force(tokens, threshold)
+
+    def test_float_boundary_not_missed(self):
+        """J = 7/25 at threshold 0.28 must survive 0.28 * 25 == 7.000000000000001."""
+        shared = [f"s{k}" for k in range(7)]
+        a = _tokenize(" ".join(shared + [f"a{k}" for k in range(18)]))
+        b = _tokenize(" ".join(shared))
+        tokens = [a, b]
+        pairs = _candidate_pairs(tokens, 0.28)
+        assert [(i, j) for i, j, _ in pairs] == [(0, 1)]
+        assert pairs == self._brute_force(tokens, 0.28)
+
+    def test_empty_sets_skipped(self):
+        tokens = [_tokenize(""), _tokenize(""), _tokenize("x")]
+        assert _candidate_pairs(tokens, 0.3) == []
+
 
 # ---------------------------------------------------------------------------
 # _merge_tags
@@ -82,6 +134,12 @@ class TestMergeTags:
         tags = set(result.split(","))
         assert tags == {"a", "b", "c"}
 
+    def test_one_side_empty_still_normalized(self):
+        assert _merge_tags(" b , a ,, a", None) == "a,b"
+
+    def test_output_sorted(self):
+        assert _merge_tags("zeta,alpha", "mid") == "alpha,mid,zeta"
+
 
 # ---------------------------------------------------------------------------
 # soft_delete
@@ -89,8 +147,8 @@ class TestMergeTags:
 
 class TestSoftDelete:
 
-    def test_soft_delete_marks_deleted(self, populated_db):
-        db = MemoryDB(populated_db)
+    def test_soft_delete_marks_deleted(self, mutable_populated_db):
+        db = MemoryDB(mutable_populated_db)
         memories = db.get_all_memories()
         target_hash = memories[0]["content_hash"]
 
@@ -117,29 +175,32 @@ class TestRunCompact:
 
     def _make_similar_db(self, tmp_db):
         """Create a DB with two very similar memories."""
-        db = MemoryDB(tmp_db)
-        db.store_memory(Memory(
-            content="James discussed the DeCue funding strategy for Q1 planning",
-            tags="james,decue,funding",
-        ))
-        time.sleep(0.01)
-        db.store_memory(Memory(
-            content="James discussed the DeCue funding strategy for Q1 execution",
-            tags="james,decue,funding",
-        ))
-        db.close()
+        with MemoryDB(tmp_db) as db, db.transaction():
+            db.store_memory(Memory(
+                content="James discussed the DeCue funding strategy for Q1 planning",
+                tags="james,decue,funding",
+            ))
+            time.sleep(0.01)
+            db.store_memory(Memory(
+                content="James discussed the DeCue funding strategy for Q1 execution",
+                tags="james,decue,funding",
+            ))
 
     def test_compact_finds_duplicates(self, tmp_db):
         """Two similar memories should be found and one soft-deleted."""
         self._make_similar_db(tmp_db)
 
-        with patch("hippoclaudus.compactor.run_prompt") as mock_rp, \
+        with patch("hippoclaudus.compactor.iter_run_prompt") as mock_rp, \
              patch("hippoclaudus.compactor.extract_json") as mock_ej:
-            mock_rp.return_value = MOCK_MERGE_RESPONSE
-            mock_ej.return_value = json.loads(MOCK_MERGE_RESPONSE)
+            mock_rp.return_value = [MOCK_MERGE_RESPONSE]
+            mock_ej.return_value = MOCK_MERGE_DICT
 
             run_compact("mock-model", tmp_db, dry_run=False, threshold=0.3)
 
+            # All candidate pairs go to the LLM in a single batched call
+            mock_rp.assert_called_once()
+            assert len(mock_rp.call_args[0][1]) == 1
+
         db = MemoryDB(tmp_db)
         remaining = db.get_all_memories()
         db.close()
@@ -149,10 +210,10 @@ class TestRunCompact:
         """Dry run should not delete anything."""
         self._make_similar_db(tmp_db)
 
-        with patch("hippoclaudus.compactor.run_prompt") as mock_rp, \
+        with patch("hippoclaudus.compactor.iter_run_prompt") as mock_rp, \
              patch("hippoclaudus.compactor.extract_json") as mock_ej:
-            mock_rp.return_value = MOCK_MERGE_RESPONSE
-            mock_ej.return_value = json.loads(MOCK_MERGE_RESPONSE)
+            mock_rp.return_value = [MOCK_MERGE_RESPONSE]
+            mock_ej.return_value = MOCK_MERGE_DICT
 
             run_compact("mock-model", tmp_db, dry_run=True, threshold=0.3)
 
@@ -172,9 +233,9 @@ class TestRunCompact:
             "reasoning": "Combining both perspectives",
         }
 
-        with patch("hippoclaudus.compactor.run_prompt") as mock_rp, \
+        with patch("hippoclaudus.compactor.iter_run_prompt") as mock_rp, \
              patch("hippoclaudus.compactor.extract_json") as mock_ej:
-            mock_rp.return_value = json.dumps(merge_response)
+            mock_rp.return_value = [json.dumps(merge_response)]
             mock_ej.return_value = merge_response
 
             run_compact("mock-model", tmp_db, dry_run=False, threshold=0.3)
@@ -190,9 +251,9 @@ class TestRunCompact:
         """LLM returning None should skip the pair, not crash."""
         self._make_similar_db(tmp_db)
 
-        with patch("hippoclaudus.compactor.run_prompt") as mock_rp, \
+        with patch("hippoclaudus.compactor.iter_run_prompt") as mock_rp, \
              patch("hippoclaudus.compactor.extract_json") as mock_ej:
-            mock_rp.return_value = "gibberish"
+            mock_rp.return_value = ["gibberish"]
             mock_ej.return_value = None
 
             run_compact("mock-model", tmp_db, dry_run=False, threshold=0.3)
@@ -208,6 +269,6 @@ class TestRunCompact:
         db.store_memory(Memory(content="lonely memory"))
         db.close()
 
-        with patch("hippoclaudus.compactor.run_prompt") as mock_rp:
+        with patch("hippoclaudus.compactor.iter_run_prompt") as mock_rp:
             run_compact("mock-model", tmp_db, dry_run=False)
             mock_rp.assert_not_called()
@@ -14,7 +14,7 @@ sys.path.insert(0, str(MCP_ROOT))
 from tests.conftest import MOCK_PREDICT_RESPONSE
 
 from hippoclaudus.db_bridge import MemoryDB, Memory
-from hippoclaudus.predictor import run_predict
+from hippoclaudus.predictor import run_predict, _recent_sessions
 
 
 # ---------------------------------------------------------------------------
@@ -100,12 +100,36 @@ class TestPredictMocked:
             # Check the prompt that was passed to run_prompt
             call_args = mock_rp.call_args
             prompt_text = call_args[0][1] if len(call_args[0]) > 1 else call_args[1].get("prompt", "")
-            # The session_text portion should be capped
-            # (run_predict caps session_text at 3000 chars via [:3000])
+            # The session_text portion should be capped at SESSION_TEXT_CAP
+            assert "Long Session" in prompt_text
+            assert prompt_text.count("A") < 3000
 
         assert output.exists()
 
 
+# ---------------------------------------------------------------------------
+# Session log slicing
+# ---------------------------------------------------------------------------
+
+class TestRecentSessions:
+
+    def test_last_two_sessions(self, sample_session_log):
+        text = sample_session_log.read_text()
+        result = _recent_sessions(text, count=2)
+        assert result.startswith("2026-02-07 -- Session 1")
+        assert "Session 2" in result
+
+    def test_single_session(self):
+        assert _recent_sessions("# Log\n\n## Only\nbody\n") == "Only\nbody\n"
+
+    def test_no_sessions(self):
+        assert _recent_sessions("# Log with no sessions\n") == ""
+
+    def test_capped(self):
+        text = "# Log\n\n## S1\n" + "x" * 10
+        assert _recent_sessions(text, cap=5) == "S1\nxx"
+
+
 # ---------------------------------------------------------------------------
 # Real Mistral
 # ---------------------------------------------------------------------------
@@ -1,6 +1,5 @@
 """Communication profile analysis tests."""
 
-import json
 import sys
 import time
 from pathlib import Path
@@ -11,7 +10,7 @@ import pytest
 MCP_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(MCP_ROOT))
 
-from tests.conftest import MOCK_COMM_PROFILE_RESPONSE
+from tests.conftest import MOCK_COMM_PROFILE_DICT
 
 from hippoclaudus.db_bridge import MemoryDB, Memory
 from hippoclaudus.comm_profiler import run_comm_profile
@@ -26,7 +25,7 @@ class TestCommProfileMocked:
     def test_profile_with_relationship_file(self, populated_db, long_term_dir):
         """Should find James's relationship file and include it in excerpts."""
         with patch("hippoclaudus.comm_profiler.analyze_comm_profile") as mock_llm:
-            mock_llm.return_value = json.loads(MOCK_COMM_PROFILE_RESPONSE)
+            mock_llm.return_value = MOCK_COMM_PROFILE_DICT
             run_comm_profile("mock-model", populated_db, "James", long_term_dir)
 
             # LLM should have been called
@@ -51,7 +50,7 @@ class TestCommProfileMocked:
     def test_case_insensitive_file_match(self, populated_db, long_term_dir):
         """Searching for 'james' (lowercase) should find Claude_Relationships_James.md."""
         with patch("hippoclaudus.comm_profiler.analyze_comm_profile") as mock_llm:
-            mock_llm.return_value = json.loads(MOCK_COMM_PROFILE_RESPONSE)
+            mock_llm.return_value = MOCK_COMM_PROFILE_DICT
             run_comm_profile("mock-model", populated_db, "james", long_term_dir)
             # Should still find the file via case-insensitive glob fallback
             mock_llm.assert_called_once()
@@ -64,7 +63,7 @@ class TestCommProfileMocked:
         db.close()
 
         with patch("hippoclaudus.comm_profiler.analyze_comm_profile") as mock_llm:
-            mock_llm.return_value = json.loads(MOCK_COMM_PROFILE_RESPONSE)
+            mock_llm.return_value = MOCK_COMM_PROFILE_DICT
             run_comm_profile("mock-model", tmp_db, "Dan", long_term_dir)
             # Ideally shouldn't be called, but "Dan" is substring of "Canada"
             mock_llm.assert_not_called()
@@ -1,5 +1,6 @@
 """Adversarial tests — SQL injection, concurrency, malformed input, huge payloads."""
 
+import contextlib
 import json
 import sqlite3
 import sys
@@ -14,10 +15,34 @@ MCP_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(MCP_ROOT))
 
 from hippoclaudus.db_bridge import MemoryDB, Memory
-from hippoclaudus.compactor import _similarity_simple
+from hippoclaudus.compactor import _similarity_simple, _tokenize, _jaccard, _candidate_pairs
 from hippoclaudus.llm import extract_json
 from hippoclaudus.scoring import recency_decay, access_score, composite_score, ScoringWeights
 
+# Wall-clock ceiling for finding similar pairs among 50 memories in TestCompactorStress
+COMPACTOR_PAIR_BUDGET_S = 0.25
+
+
+def _build_nested(depth: int) -> dict:
+    """{"level": 0, "child": {"level": 1, "child": ...}} nested depth levels deep."""
+    nested = {"level": depth - 1}
+    for i in range(depth - 2, -1, -1):
+        nested = {"level": i, "child": nested}
+    return nested
+
+
+NESTED_50 = _build_nested(50)
+NESTED_50_JSON = json.dumps(NESTED_50)
+
+# Large immutable payloads, built once at import rather than in each test
+HUGE_CONTENT_1MB = "A" * (1024 * 1024)
+HUGE_NON_JSON_1MB = "x" * (1024 * 1024)
+LARGE_SESSION_LOG = (
+    "# Log\n\n"
+    "## 2026-01-01 -- Old Session\n\n" + ("X" * 500000) + "\n\n"
+    "## 2026-02-08 -- Recent Session\n\n" + ("Y" * 500000) + "\n"
+)
+
 
 # ---------------------------------------------------------------------------
 # SQL injection
@@ -25,139 +50,114 @@ from hippoclaudus.scoring import recency_decay, access_score, composite_score, S
 
 class TestSQLInjection:
 
-    def test_injection_in_content(self, tmp_db):
+    def test_injection_in_content(self, fresh_db):
         """SQL injection in content field should be parameterized away."""
-        db = MemoryDB(tmp_db)
         m = Memory(content="Robert'; DROP TABLE memories; --")
-        db.store_memory(m)
-        result = db.get_memory_by_hash(m.content_hash)
+        fresh_db.store_memory(m)
+        result = fresh_db.get_memory_by_hash(m.content_hash)
         assert result is not None
         assert "DROP TABLE" in result["content"]
         # Table should still exist
-        count = db.get_memory_count()
+        count = fresh_db.get_memory_count()
         assert count == 1
-        db.close()
 
-    def test_injection_in_tags(self, tmp_db):
+    def test_injection_in_tags(self, fresh_db):
         """SQL injection in tags should be safe."""
-        db = MemoryDB(tmp_db)
         m = Memory(content="test", tags="tag1'; DROP TABLE memories; --")
-        db.store_memory(m)
-        db.update_tags(m.content_hash, "newtag'; DELETE FROM memories; --")
-        refreshed = db.get_memory_by_hash(m.content_hash)
+        fresh_db.store_memory(m)
+        fresh_db.update_tags(m.content_hash, "newtag'; DELETE FROM memories; --")
+        refreshed = fresh_db.get_memory_by_hash(m.content_hash)
         assert "DELETE" in refreshed["tags"]
-        assert db.get_memory_count() == 1
-        db.close()
+        assert fresh_db.get_memory_count() == 1
 
-    def test_injection_in_search(self, tmp_db):
+    def test_injection_in_search(self, fresh_db):
         """SQL injection in search_by_tag should be safe."""
-        db = MemoryDB(tmp_db)
-        db.store_memory(Memory(content="safe content", tags="safe"))
-        results = db.search_by_tag("'; DROP TABLE memories; --")
+        fresh_db.store_memory(Memory(content="safe content", tags="safe"))
+        results = fresh_db.search_by_tag("'; DROP TABLE memories; --")
         assert isinstance(results, list)
         # Table still works
-        assert db.get_memory_count() == 1
-        db.close()
+        assert fresh_db.get_memory_count() == 1
 
-    def test_injection_in_hash_lookup(self, tmp_db):
+    def test_injection_in_hash_lookup(self, fresh_db):
         """SQL injection in get_memory_by_hash should be safe."""
-        db = MemoryDB(tmp_db)
-        db.store_memory(Memory(content="safe"))
-        result = db.get_memory_by_hash("' OR '1'='1")
+        fresh_db.store_memory(Memory(content="safe"))
+        result = fresh_db.get_memory_by_hash("' OR '1'='1")
         assert result is None
-        assert db.get_memory_count() == 1
-        db.close()
+        assert fresh_db.get_memory_count() == 1
 
-    def test_tables_survive_all_injections(self, tmp_db):
+    def test_tables_survive_all_injections(self, fresh_db):
         """After all injection attempts, all tables should exist."""
-        db = MemoryDB(tmp_db)
-        for payload in [
+        payloads = [
             "'; DROP TABLE memories; --",
             "1; DELETE FROM memory_graph WHERE 1=1; --",
             "' UNION SELECT * FROM metadata; --",
-        ]:
-            try:
-                db.store_memory(Memory(content=payload))
-            except sqlite3.IntegrityError:
-                pass  # duplicate hash
+        ]
+        # Distinct payloads hash distinctly, so every insert must succeed
+        for payload in payloads:
+            fresh_db.store_memory(Memory(content=payload))
+        assert fresh_db.get_memory_count() == len(payloads)
 
-        cursor = db.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        cursor = fresh_db.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
         tables = [r[0] for r in cursor.fetchall()]
         for expected in ["memories", "memory_graph", "metadata"]:
             assert expected in tables
-        db.close()
 
 
 # ---------------------------------------------------------------------------
 # Malformed input
 # ---------------------------------------------------------------------------
 
+@pytest.fixture(scope="module")
+def huge_memory():
+    """1MB Memory, built (and SHA-256 hashed) once per module."""
+    return Memory(content=HUGE_CONTENT_1MB)
+
+
 class TestMalformedInput:
 
-    def test_huge_content(self, tmp_db):
+    def test_huge_content(self, fresh_db, huge_memory):
         """1MB content should store and retrieve correctly."""
-        db = MemoryDB(tmp_db)
-        huge = "A" * (1024 * 1024)  # 1MB
-        m = Memory(content=huge)
-        db.store_memory(m)
-        result = db.get_memory_by_hash(m.content_hash)
+        fresh_db.store_memory(huge_memory)
+        result = fresh_db.get_memory_by_hash(huge_memory.content_hash)
         assert result is not None
         assert len(result["content"]) == 1024 * 1024
-        db.close()
 
-    def test_unicode_content(self, tmp_db):
+    def test_unicode_content(self, fresh_db):
         """Unicode and emoji should work fine."""
-        db = MemoryDB(tmp_db)
         m = Memory(content="日本語テスト 🚀🧠 café naïve résumé")
-        db.store_memory(m)
-        result = db.get_memory_by_hash(m.content_hash)
+        fresh_db.store_memory(m)
+        result = fresh_db.get_memory_by_hash(m.content_hash)
         assert "🚀" in result["content"]
         assert "café" in result["content"]
-        db.close()
 
-    def test_null_bytes_in_content(self, tmp_db):
+    def test_null_bytes_in_content(self, fresh_db):
         """Null bytes in content shouldn't crash."""
-        db = MemoryDB(tmp_db)
         m = Memory(content="hello\x00world")
-        db.store_memory(m)
-        result = db.get_memory_by_hash(m.content_hash)
+        fresh_db.store_memory(m)
+        result = fresh_db.get_memory_by_hash(m.content_hash)
         assert result is not None
-        db.close()
 
-    def test_newlines_in_tags(self, tmp_db):
+    def test_newlines_in_tags(self, fresh_db):
         """Newlines in tags — unusual but shouldn't crash."""
-        db = MemoryDB(tmp_db)
         m = Memory(content="test", tags="tag1\ntag2\ttag3")
-        db.store_memory(m)
-        result = db.get_memory_by_hash(m.content_hash)
+        fresh_db.store_memory(m)
+        result = fresh_db.get_memory_by_hash(m.content_hash)
         assert result["tags"] == "tag1\ntag2\ttag3"
-        db.close()
 
-    def test_deeply_nested_metadata(self, tmp_db):
+    def test_deeply_nested_metadata(self, fresh_db):
         """Deeply nested metadata dict should serialize to JSON."""
-        db = MemoryDB(tmp_db)
-        meta = {"level": 0}
-        current = meta
-        for i in range(1, 50):
-            current["child"] = {"level": i}
-            current = current["child"]
-
-        m = Memory(content="nested test", metadata=meta)
-        db.store_memory(m)
-        result = db.get_memory_by_hash(m.content_hash)
-        stored_meta = json.loads(result["metadata"])
-        assert stored_meta["level"] == 0
-        db.close()
+        m = Memory(content="nested test", metadata=NESTED_50)
+        fresh_db.store_memory(m)
+        result = fresh_db.get_memory_by_hash(m.content_hash)
+        assert result["metadata"] == NESTED_50_JSON
 
-    def test_empty_content(self, tmp_db):
+    def test_empty_content(self, fresh_db):
         """Empty string content should still work (hash of empty string)."""
-        db = MemoryDB(tmp_db)
         m = Memory(content="")
-        db.store_memory(m)
-        result = db.get_memory_by_hash(m.content_hash)
+        fresh_db.store_memory(m)
+        result = fresh_db.get_memory_by_hash(m.content_hash)
         assert result is not None
         assert result["content"] == ""
-        db.close()
 
 
 # ---------------------------------------------------------------------------
@@ -166,51 +166,47 @@ class TestMalformedInput:
 
 class TestJsonExtractionStress:
 
-    def test_nested_braces_in_strings(self):
-        """JSON with braces inside string values."""
-        text = '{"code": "if (x) { return y; }", "count": 1}'
-        result = extract_json(text)
-        # This may or may not work depending on the greedy regex
-        # If it works, great. If not, it's a known limitation.
-        if result is not None:
-            assert result["count"] == 1
-
-    def test_huge_non_json(self):
-        """1MB of non-JSON text should return None, not hang."""
-        text = "x" * (1024 * 1024)
-        result = extract_json(text)
-        assert result is None
-
-    def test_many_nested_braces(self):
-        """500 nested braces — regex stress test."""
-        text = "{" * 500 + '"key": "value"' + "}" * 500
-        result = extract_json(text)
-        # May fail to parse but shouldn't hang or crash
-        # (result can be None or a dict)
-
-    def test_json_in_markdown(self):
-        """JSON wrapped in markdown formatting."""
-        text = "## Results\n\nHere's the output:\n\n```json\n{\"status\": \"ok\", \"items\": 3}\n```\n\nDone."
-        result = extract_json(text)
-        assert result == {"status": "ok", "items": 3}
+    @pytest.mark.parametrize("text,expected", [
+        # Braces inside string values don't affect object boundaries
+        pytest.param('{"code": "if (x) { return y; }", "count": 1}',
+                     {"code": "if (x) { return y; }", "count": 1}, id="braces_in_strings"),
+        # 1MB with no '{' at all: returns None without scanning per character
+        pytest.param(HUGE_NON_JSON_1MB, None, id="huge_non_json"),
+        # Each bad start fails at its next char; the innermost object decodes
+        pytest.param("{" * 500 + '"key": "value"' + "}" * 500, {"key": "value"}, id="many_nested_braces"),
+        pytest.param("## Results\n\nHere's the output:\n\n```json\n{\"status\": \"ok\", \"items\": 3}\n```\n\nDone.",
+                     {"status": "ok", "items": 3}, id="json_in_markdown"),
+    ])
+    def test_extract_json_stress(self, text, expected):
+        assert extract_json(text) == expected
 
 
 # ---------------------------------------------------------------------------
 # Concurrency
 # ---------------------------------------------------------------------------
 
+# Threaded tests stay on one xdist worker under --dist loadgroup
+@pytest.mark.xdist_group("concurrency")
 class TestConcurrency:
 
-    def test_concurrent_writes(self, tmp_db):
-        """5 threads × 10 writes each — tests WAL concurrency."""
+    @pytest.mark.parametrize("db_fixture", ["shared_mem_db", "tmp_db"])
+    def test_concurrent_writes(self, db_fixture, request):
+        """5 threads × 10 writes each — shared in-memory DB, then WAL on disk.
+
+        Shared-cache connections fail fast on table locks instead of waiting
+        on busy_timeout, so in-memory writes are serialized with a lock. The
+        file-backed run leaves contention to WAL + busy_timeout.
+        """
+        db_path = request.getfixturevalue(db_fixture)
+        write_lock = threading.Lock() if db_fixture == "shared_mem_db" else contextlib.nullcontext()
         errors = []
 
         def writer(thread_id):
             try:
-                db = MemoryDB(tmp_db)
-                for i in range(10):
-                    m = Memory(content=f"thread-{thread_id}-item-{i}")
-                    db.store_memory(m)
+                db = MemoryDB(db_path)
+                batch = [Memory(content=f"thread-{thread_id}-item-{i}") for i in range(10)]
+                with write_lock:
+                    db.store_memories(batch)  # one transaction per thread
                 db.close()
             except Exception as e:
                 errors.append((thread_id, str(e)))
@@ -223,35 +219,37 @@ class TestConcurrency:
 
         assert len(errors) == 0, f"Concurrent write errors: {errors}"
 
-        db = MemoryDB(tmp_db)
+        db = MemoryDB(db_path)
         count = db.get_memory_count()
         db.close()
         assert count == 50
 
-    def test_concurrent_read_write(self, populated_db):
+    def test_concurrent_read_write(self, mutable_populated_db):
         """Simultaneous reads and writes shouldn't deadlock."""
         errors = []
+        # Release all three threads at once so their work actually overlaps
+        start = threading.Barrier(3, timeout=10)
 
         def reader():
             try:
-                db = MemoryDB(populated_db)
+                db = MemoryDB(mutable_populated_db)
+                start.wait()
                 for _ in range(20):
                     db.get_all_memories()
-                    time.sleep(0.001)
                 db.close()
             except Exception as e:
                 errors.append(("reader", str(e)))
 
         def writer():
             try:
-                db = MemoryDB(populated_db)
+                db = MemoryDB(mutable_populated_db)
+                start.wait()
                 for i in range(10):
                     m = Memory(content=f"concurrent-write-{i}")
                     try:
                         db.store_memory(m)
                     except sqlite3.IntegrityError:
                         pass
-                    time.sleep(0.001)
                 db.close()
             except Exception as e:
                 errors.append(("writer", str(e)))
@@ -276,24 +274,36 @@ class TestConcurrency:
 class TestCompactorStress:
 
     def test_many_memories(self, tmp_db):
-        """50 memories → 1225 pairwise comparisons. Should complete fast."""
-        db = MemoryDB(tmp_db)
-        for i in range(50):
-            db.store_memory(Memory(content=f"Memory number {i} about topic {i % 5}"))
-        db.close()
-
-        # Just test that _similarity_simple can handle all pairs without error
-        memories = []
-        db = MemoryDB(tmp_db)
-        memories = db.get_all_memories(limit=100)
-        db.close()
+        """50 memories (1225 possible pairs) at a realistic threshold. Should complete fast."""
+        with MemoryDB(tmp_db) as db:
+            with db.transaction():
+                for i in range(50):
+                    db.store_memory(Memory(content=f"Memory number {i} about topic {i % 5}"))
+            memories = db.get_all_memories(limit=100)
+
+        # Tokenize once, as run_compact does, then find pairs through the prefix
+        # index (threshold > 0). Takes ~1ms; the budget leaves room for slow CI
+        # while still failing on gross regressions.
+        threshold = 0.6
+        start = time.perf_counter()
+        tokens = [_tokenize(m["content"]) for m in memories]
+        pairs = _candidate_pairs(tokens, threshold)
+        elapsed = time.perf_counter() - start
+        assert elapsed < COMPACTOR_PAIR_BUDGET_S, f"50 memories took {elapsed:.3f}s"
+
+        # Same-topic memories clear 0.6, so the index must find them all
+        brute = [
+            (i, j, _jaccard(tokens[i], tokens[j]))
+            for i in range(len(tokens))
+            for j in range(i + 1, len(tokens))
+            if _jaccard(tokens[i], tokens[j]) >= threshold
+        ]
+        assert pairs
+        assert pairs == brute
 
-        count = 0
-        for i in range(len(memories)):
-            for j in range(i + 1, len(memories)):
-                _similarity_simple(memories[i]["content"], memories[j]["content"])
-                count += 1
-        assert count == 1225
+        # Spot-check the pre-tokenized path against the one-shot helper
+        i, j, sim = pairs[0]
+        assert sim == _similarity_simple(memories[i]["content"], memories[j]["content"])
 
     def test_single_char_tokens(self):
         """Single-character tokens should work."""
@@ -358,13 +368,11 @@ class TestSessionLogAdversarial:
     def test_large_session_log(self, tmp_path):
         """Large (1MB) session log should still parse."""
         log = tmp_path / "large.md"
-        content = "# Log\n\n"
-        content += "## 2026-01-01 -- Old Session\n\n" + ("X" * 500000) + "\n\n"
-        content += "## 2026-02-08 -- Recent Session\n\n" + ("Y" * 500000) + "\n"
-        log.write_text(content)
+        log.write_text(LARGE_SESSION_LOG)
         result = MemoryDB.parse_latest_session(str(log))
         assert result is not None
-        assert "Recent Session" in result
+        assert result.startswith("## 2026-02-08 -- Recent Session")
+        assert "Old Session" not in result and "X" not in result
 
 
 # ---------------------------------------------------------------------------
@@ -9,19 +9,22 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from hippoclaudus.personalizer import (
+    find_personalize_blocks, replace_personalize_block, generate_identity_block,
+    generate_people_block, generate_machine_block,
+)
+
 
 class TestPersonalizerBlocks:
     """PERSONALIZE block detection and replacement."""
 
     def test_find_personalize_blocks(self):
-        from hippoclaudus.personalizer import find_personalize_blocks
         content = "# Header\n<!-- PERSONALIZE: identity -->\nsome text\n<!-- END PERSONALIZE -->\nfooter"
         blocks = find_personalize_blocks(content)
         assert len(blocks) >= 1
         assert blocks[0]["tag"] == "identity"
 
     def test_replace_personalize_block(self):
-        from hippoclaudus.personalizer import replace_personalize_block
         content = "before\n<!-- PERSONALIZE: identity -->\nold content\n<!-- END PERSONALIZE -->\nafter"
         result = replace_personalize_block(content, "identity", "new content")
         assert "new content" in result
@@ -30,7 +33,6 @@ class TestPersonalizerBlocks:
         assert "after" in result
 
     def test_replace_preserves_unmatched_blocks(self):
-        from hippoclaudus.personalizer import replace_personalize_block
         content = (
             "<!-- PERSONALIZE: identity -->\nid stuff\n<!-- END PERSONALIZE -->\n"
             "<!-- PERSONALIZE: people -->\npeople stuff\n<!-- END PERSONALIZE -->"
@@ -44,7 +46,6 @@ class TestGenerateBlocks:
     """Generate content for personalization blocks."""
 
     def test_generate_identity_block(self):
-        from hippoclaudus.personalizer import generate_identity_block
         result = generate_identity_block(
             user_name="Jane",
             persona_name="Atlas",
@@ -55,7 +56,6 @@ class TestGenerateBlocks:
         assert "data science" in result
 
     def test_generate_identity_block_no_persona(self):
-        from hippoclaudus.personalizer import generate_identity_block
         result = generate_identity_block(
             user_name="Jane",
             persona_name=None,
@@ -65,7 +65,6 @@ class TestGenerateBlocks:
         assert "persona" not in result.lower() or "no specific persona" in result.lower()
 
     def test_generate_people_block(self):
-        from hippoclaudus.personalizer import generate_people_block
         people = [
             {"name": "Alice", "relationship": "manager", "role": "Engineering Director"},
             {"name": "Bob", "relationship": "colleague", "role": "Backend Engineer"},
@@ -76,11 +75,9 @@ class TestGenerateBlocks:
         assert "manager" in result
 
     def test_generate_people_block_empty(self):
-        from hippoclaudus.personalizer import generate_people_block
         result = generate_people_block([])
         assert isinstance(result, str)  # Should return something, even if minimal
 
     def test_generate_machine_block(self):
-        from hippoclaudus.personalizer import generate_machine_block
         result = generate_machine_block("MacBook Pro M3, primary development machine")
         assert "MacBook" in result
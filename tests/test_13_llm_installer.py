@@ -3,75 +3,59 @@
 
 import sys
 from pathlib import Path
-from unittest.mock import patch, MagicMock
 
 import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from hippoclaudus.llm_installer import detect_hardware, get_packages_for_backend, get_default_model
+
+
+@pytest.fixture
+def fake_hardware(request, monkeypatch):
+    """Pin (platform, apple_silicon, nvidia_gpu) for detect_hardware."""
+    plat, apple_silicon, nvidia = request.param
+    monkeypatch.setattr("hippoclaudus.llm_installer.detect_platform", lambda: plat)
+    monkeypatch.setattr("hippoclaudus.llm_installer._is_apple_silicon", lambda: apple_silicon)
+    monkeypatch.setattr("hippoclaudus.llm_installer._has_nvidia_gpu", lambda: nvidia)
+
 
 class TestHardwareDetection:
     """Detect GPU/hardware for LLM backend selection."""
 
     def test_detect_hardware_returns_dict(self):
-        from hippoclaudus.llm_installer import detect_hardware
         result = detect_hardware()
         assert "backend" in result
         assert result["backend"] in ("mlx", "cuda", "cpu")
 
-    @patch("hippoclaudus.llm_installer.detect_platform", return_value="darwin")
-    @patch("hippoclaudus.llm_installer._is_apple_silicon", return_value=True)
-    def test_detect_apple_silicon(self, mock_silicon, mock_plat):
-        from hippoclaudus.llm_installer import detect_hardware
-        result = detect_hardware()
-        assert result["backend"] == "mlx"
-
-    @patch("hippoclaudus.llm_installer.detect_platform", return_value="linux")
-    @patch("hippoclaudus.llm_installer._has_nvidia_gpu", return_value=True)
-    def test_detect_nvidia(self, mock_gpu, mock_plat):
-        from hippoclaudus.llm_installer import detect_hardware
-        result = detect_hardware()
-        assert result["backend"] == "cuda"
-
-    @patch("hippoclaudus.llm_installer.detect_platform", return_value="linux")
-    @patch("hippoclaudus.llm_installer._has_nvidia_gpu", return_value=False)
-    @patch("hippoclaudus.llm_installer._is_apple_silicon", return_value=False)
-    def test_detect_cpu_fallback(self, mock_silicon, mock_gpu, mock_plat):
-        from hippoclaudus.llm_installer import detect_hardware
-        result = detect_hardware()
-        assert result["backend"] == "cpu"
+    @pytest.mark.parametrize("fake_hardware,expected", [
+        (("darwin", True, False), "mlx"),
+        (("linux", False, True), "cuda"),
+        (("linux", False, False), "cpu"),
+    ], indirect=["fake_hardware"], ids=["apple_silicon", "nvidia", "cpu_fallback"])
+    def test_detect_backend(self, fake_hardware, expected):
+        assert detect_hardware()["backend"] == expected
 
 
 class TestPackageList:
     """Correct packages for each backend."""
 
-    def test_mlx_packages(self):
-        from hippoclaudus.llm_installer import get_packages_for_backend
-        pkgs = get_packages_for_backend("mlx")
-        assert "mlx" in pkgs
-        assert "mlx-lm" in pkgs
-
-    def test_cuda_packages(self):
-        from hippoclaudus.llm_installer import get_packages_for_backend
-        pkgs = get_packages_for_backend("cuda")
-        assert "llama-cpp-python" in pkgs
-
-    def test_cpu_packages(self):
-        from hippoclaudus.llm_installer import get_packages_for_backend
-        pkgs = get_packages_for_backend("cpu")
-        assert "llama-cpp-python" in pkgs
+    @pytest.mark.parametrize("backend,expected", [
+        ("mlx", {"mlx", "mlx-lm"}),
+        ("cuda", {"llama-cpp-python"}),
+        ("cpu", {"llama-cpp-python"}),
+    ])
+    def test_packages(self, backend, expected):
+        assert expected <= set(get_packages_for_backend(backend))
 
 
 class TestModelInfo:
     """Model selection for each backend."""
 
-    def test_mlx_model_name(self):
-        from hippoclaudus.llm_installer import get_default_model
-        model = get_default_model("mlx")
-        assert "mlx-community" in model
-
-    def test_cpu_model_name(self):
-        from hippoclaudus.llm_installer import get_default_model
-        model = get_default_model("cpu")
-        assert isinstance(model, str)
-        assert len(model) > 0
+    @pytest.mark.parametrize("backend,expected", [
+        ("mlx", "mlx-community"),
+        ("cuda", "GGUF"),
+        ("cpu", "GGUF"),
+    ])
+    def test_model_name(self, backend, expected):
+        assert expected in get_default_model(backend)
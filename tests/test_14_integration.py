@@ -15,6 +15,8 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from hippoclaudus.installer import run_install, run_uninstall
+
 
 class TestFullInstallRoundTrip:
     """Full install -> verify -> uninstall cycle."""
@@ -23,9 +25,6 @@ class TestFullInstallRoundTrip:
     @patch("hippoclaudus.installer.install_mcp_memory_service")
     @patch("hippoclaudus.installer.verify_mcp_install", return_value=True)
     def test_install_creates_all_expected_files(self, mock_verify, mock_mcp, mock_venv, tmp_path):
-        from hippoclaudus.installer import run_install
-        from hippoclaudus.platform import get_dotfile_path
-
         config_dir = tmp_path / "config"
         config_dir.mkdir()
         dotfile = tmp_path / ".hippoclaudus"
@@ -57,8 +56,6 @@ class TestFullInstallRoundTrip:
     @patch("hippoclaudus.installer.install_mcp_memory_service")
     @patch("hippoclaudus.installer.verify_mcp_install", return_value=True)
     def test_install_backs_up_existing_config(self, mock_verify, mock_mcp, mock_venv, tmp_path):
-        from hippoclaudus.installer import run_install
-
         config_dir = tmp_path / "config"
         config_dir.mkdir()
         config_path = config_dir / "claude_desktop_config.json"
@@ -76,50 +73,27 @@ class TestFullInstallRoundTrip:
         assert "existing" in data["mcpServers"]
         assert "memory" in data["mcpServers"]
 
-    @patch("hippoclaudus.installer.create_venv")
-    @patch("hippoclaudus.installer.install_mcp_memory_service")
-    @patch("hippoclaudus.installer.verify_mcp_install", return_value=True)
-    def test_uninstall_restores_config(self, mock_verify, mock_mcp, mock_venv, tmp_path):
-        from hippoclaudus.installer import run_install, run_uninstall
-
-        config_dir = tmp_path / "config"
-        config_dir.mkdir()
-        config_path = config_dir / "claude_desktop_config.json"
-        original_config = '{"mcpServers": {"existing": {"command": "node"}}}'
-        config_path.write_text(original_config)
-        dotfile = tmp_path / ".hippoclaudus"
-        install_base = tmp_path / "Claude"
-
-        with patch("hippoclaudus.installer.get_claude_config_path", return_value=config_path), \
-             patch("hippoclaudus.installer.get_dotfile_path", return_value=dotfile):
-            run_install(base_path=install_base)
-
-            # Now uninstall (without removing data)
-            result = run_uninstall(remove_data=False)
+    def test_uninstall_restores_config(self, installed_tree):
+        result = run_uninstall(remove_data=False)
 
         assert result["success"]
         assert result["data_removed"] is False
         # Config should be restored to original
-        restored = json.loads(config_path.read_text())
+        restored = json.loads(installed_tree["config"].read_text())
         assert "existing" in restored["mcpServers"]
+        assert "memory" not in restored["mcpServers"]
 
-    @patch("hippoclaudus.installer.create_venv")
-    @patch("hippoclaudus.installer.install_mcp_memory_service")
-    @patch("hippoclaudus.installer.verify_mcp_install", return_value=True)
-    def test_uninstall_with_data_removal(self, mock_verify, mock_mcp, mock_venv, tmp_path):
-        from hippoclaudus.installer import run_install, run_uninstall
+    def test_uninstall_with_data_removal(self, fresh_installed_tree):
+        result = run_uninstall(remove_data=True)
 
-        config_dir = tmp_path / "config"
-        config_dir.mkdir()
-        config_path = config_dir / "claude_desktop_config.json"
-        dotfile = tmp_path / ".hippoclaudus"
-        install_base = tmp_path / "Claude"
+        assert result["data_removed"] is True
+        assert not (fresh_installed_tree["base"] / "mcp-memory").exists()
+        assert not fresh_installed_tree["dotfile"].exists()
 
-        with patch("hippoclaudus.installer.get_claude_config_path", return_value=config_path), \
-             patch("hippoclaudus.installer.get_dotfile_path", return_value=dotfile):
-            run_install(base_path=install_base)
-            result = run_uninstall(remove_data=True)
+    def test_uninstall_without_backup_removes_memory_entry(self, fresh_installed_tree):
+        result = run_uninstall(remove_data=False)
 
-        assert result["data_removed"] is True
-        assert not (install_base / "mcp-memory").exists()
-        assert not dotfile.exists()
+        # No original config means no backup, so the entry is stripped in place
+        assert result["config_restored_from"] is None
+        data = json.loads(fresh_installed_tree["config"].read_text())
+        assert "memory" not in data["mcpServers"]